@@ -0,0 +1,245 @@
+import hashlib
+from functools import lru_cache
+
+import pandas as pd
+from flask import Response, request
+from werkzeug.http import is_resource_modified
+
+try:
+    from cache import dumps
+except ImportError:  # served from the repository root as src.api
+    from src.cache import dumps
+
+
+# tables of the API, each built from a dataset the first time it is asked for
+TABLES = {
+    "items": lambda data: data.closet.drop(columns="PrimaryC"),
+    "counts": lambda data: data.counts,
+    # cpw_table has a row per wear, the API one per item
+    "cpw": lambda data: data.cpw.drop(columns="Date").drop_duplicates("ID"),
+    "seasons": lambda data: pd.concat(
+        [counts.assign(Season=season) for season, counts in data.season_counts.items()],
+        ignore_index=True,
+    ),
+    "heatmap": lambda data: data.heatmap_rows.assign(
+        Date=data.heatmap_rows["Date"].dt.strftime("%Y-%m-%d")
+    ),
+    "rentals": lambda data: data.rentals,
+}
+
+# single objects of the API
+SUMMARIES = {
+    "summary": lambda data: data.stats,
+    "rentals/summary": lambda data: data.rental_stats,
+    # seconds each source of the snapshot took to load
+    "sources": lambda data: data.load_times,
+}
+
+# query parameters that are not column filters
+PAGING = {"page", "per_page", "fields"}
+
+# columns whose filters are compared as numbers, so ?Price=15 matches 15.0
+NUMERIC = {"integer", "floating", "mixed-integer-float", "decimal"}
+
+
+@lru_cache(maxsize=2 * len(TABLES))
+def table(data, name):
+    """
+    Function to build one API table of a dataset, kept for the dataset and
+    the one before it while a refresh swaps them.
+
+    Parameters:
+    -----------
+        data : WardrobeDataset
+            Dataset the table is drawn from.
+        name : str
+            Key of TABLES.
+
+    Returns:
+    --------
+        table : pandas.DataFrame or None
+            Rows of the table, None when the dataset does not have them.
+    """
+    frame = TABLES[name](data)
+    if frame is None:
+        return None
+    # NaN and NaT are written as null
+    return frame.astype(object).where(frame.notna(), None)
+
+
+def error(status, message):
+    """Function to return a JSON error response."""
+    return Response(
+        dumps({"error": message}), status=status, mimetype="application/json"
+    )
+
+
+class WardrobeAPI:
+    """
+    Read-only JSON API over the tables and summaries of the current dataset.
+
+    Tables are paginated with ?page= and ?per_page=, narrowed to some
+    columns with ?fields=a,b and filtered with ?<column>=<value>, where the
+    value is read as a number or a boolean when the column holds those.
+    Responses carry an ETag of the build, the data version and the query,
+    and unchanged ones are answered with 304 Not Modified before any work
+    is done.
+
+    With a render cache, charts/savings reports the bytes of data trimmed
+    from the charts of the current version, per plot function.
+
+    Parameters:
+    -----------
+        provider : DataProvider
+            Provider of the dataset.
+        prefix : str
+            URL path the API is served from, with its version.
+        per_page : int
+            Rows per page when not asked for.
+        max_per_page : int
+            Most rows a page can be asked for.
+        charts : RenderCache, optional
+            Cache of the charts rendered by this process.
+        build : str
+            Fingerprint of the code, so a deployment changing the tables
+            changes their ETags.
+    """
+
+    def __init__(
+        self,
+        provider,
+        prefix="/api/v1/",
+        per_page=100,
+        max_per_page=1000,
+        charts=None,
+        build="",
+    ):
+        self.provider = provider
+        self.build = build
+        self.prefix = prefix
+        self.per_page = per_page
+        self.max_per_page = max_per_page
+        self.charts = charts
+
+    def etag(self, version):
+        """Function to return the ETag of the current request for a data version."""
+        query = hashlib.md5(request.full_path.encode()).hexdigest()[:12]
+        return f"{self.build}-{version}-{query}"
+
+    def respond(self, body, etag=None):
+        headers = {"Cache-Control": "no-cache"}
+        if etag is not None:
+            headers["ETag"] = f'"{etag}"'
+        return Response(dumps(body), mimetype="application/json", headers=headers)
+
+    def page(self, frame):
+        """
+        Function to filter, narrow and paginate a table for the current request.
+
+        Parameters:
+        -----------
+            frame : pandas.DataFrame
+                Table obtained from table.
+
+        Returns:
+        --------
+            body : dict or flask.Response
+                Page of rows and the paging details, or an error response.
+        """
+        args = request.args
+        try:
+            page = int(args.get("page", 1))
+            per_page = int(args.get("per_page", self.per_page))
+        except ValueError:
+            return error(400, "page and per_page must be integers")
+        if page < 1 or not 1 <= per_page <= self.max_per_page:
+            return error(
+                400, f"page must be positive, per_page from 1 to {self.max_per_page}"
+            )
+
+        fields = list(frame.columns)
+        if args.get("fields"):
+            fields = args["fields"].split(",")
+            unknown = [f for f in fields if f not in frame.columns]
+            if unknown:
+                return error(400, f"unknown fields: {', '.join(unknown)}")
+
+        for column, value in args.items():
+            if column in PAGING:
+                continue
+            if column not in frame.columns:
+                return error(400, f"unknown filter: {column}")
+            kind = pd.api.types.infer_dtype(frame[column], skipna=True)
+            if kind in NUMERIC:
+                try:
+                    value = float(value)
+                except ValueError:
+                    return error(400, f"{column} must be a number")
+                frame = frame[frame[column].map(lambda v: v == value)]
+            elif kind == "boolean":
+                value = value.lower() in ("true", "1")
+                frame = frame[frame[column].map(lambda v: v == value)]
+            else:
+                frame = frame[frame[column].astype(str) == value]
+
+        pages = max(1, -(-len(frame) // per_page))
+        rows = frame.iloc[(page - 1) * per_page : page * per_page][fields]
+        return {
+            "count": len(frame),
+            "page": page,
+            "pages": pages,
+            "per_page": per_page,
+            "data": rows.to_dict("records"),
+        }
+
+    def register(self, server):
+        """
+        Function to add the API routes to a Flask server.
+
+        Parameters:
+        -----------
+            server : flask.Flask
+                Server of the Dash app.
+        """
+
+        def serve_index():
+            return self.respond(
+                {"tables": sorted(TABLES), "summaries": sorted(SUMMARIES)},
+                self.etag("index"),
+            )
+
+        def serve(name):
+            if name not in TABLES and name not in SUMMARIES:
+                return error(404, f"no table or summary named {name}")
+            data = self.provider.get()
+            etag = self.etag(data.version)
+            if not is_resource_modified(request.environ, etag=etag):
+                response = Response(status=304)
+                response.set_etag(etag)
+                return response
+
+            if name in SUMMARIES:
+                body = SUMMARIES[name](data)
+                if body is None:
+                    return error(404, f"the data has no {name}")
+            else:
+                frame = table(data, name)
+                if frame is None:
+                    return error(404, f"the data has no {name}")
+                body = self.page(frame)
+                if isinstance(body, Response):
+                    return body
+            return self.respond({"version": data.version, **body}, etag)
+
+        def serve_savings():
+            # grows as charts are rendered, so it is never tagged
+            return self.respond(
+                {"version": self.charts.version, "saved": self.charts.savings()}
+            )
+
+        server.add_url_rule(self.prefix, "api_index", serve_index)
+        if self.charts is not None:
+            server.add_url_rule(
+                f"{self.prefix}charts/savings", "api_savings", serve_savings
+            )
+        server.add_url_rule(f"{self.prefix}<path:name>", "api", serve)
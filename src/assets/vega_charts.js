@@ -0,0 +1,62 @@
+// Renders Vega-Lite specs from dcc.Store components into the page with
+// vega-embed, replacing one standalone iframe document per chart.
+//
+// Specs may list signals in usermeta.signals ({name: initial value}); they
+// are declared on the compiled Vega spec so the page can change them later
+// through setSignal without asking the server for a new spec.
+
+// Dash serializes dict IDs with sorted keys
+function vegaElementId(id) {
+    return JSON.stringify(id, Object.keys(id).sort());
+}
+
+const vegaViews = {};
+const vegaSignals = {};
+
+function setSignal(id, name, value) {
+    const key = vegaElementId(id);
+    vegaSignals[key] = Object.assign({}, vegaSignals[key], {[name]: value});
+    if (vegaViews[key]) {
+        vegaViews[key].signal(name, value).runAsync();
+    }
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    vega: {
+        render: function (spec, id) {
+            if (spec) {
+                const key = vegaElementId(id);
+                const signals = Object.assign(
+                    {},
+                    (spec.usermeta || {}).signals,
+                    vegaSignals[key]
+                );
+                const patch = function (vgSpec) {
+                    vgSpec.signals = (vgSpec.signals || []).concat(
+                        Object.keys(signals).map(function (name) {
+                            return {name: name, value: signals[name]};
+                        })
+                    );
+                    return vgSpec;
+                };
+                vegaEmbed(document.getElementById(key), spec, {patch: patch})
+                    .then(function (result) {
+                        if (vegaViews[key]) {
+                            vegaViews[key].finalize();
+                        }
+                        vegaViews[key] = result.view;
+                    })
+                    .catch(console.error);
+            }
+            return "vega-chart";
+        },
+        // item_name dropdown value is [position, name]
+        highlight: function (item_name, id) {
+            if (!item_name) {
+                return window.dash_clientside.no_update;
+            }
+            setSignal(id, "highlight", item_name[1]);
+            return item_name[1];
+        },
+    },
+});
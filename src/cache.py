@@ -0,0 +1,514 @@
+import hashlib
+import json
+import pickle
+import re
+import threading
+from collections import OrderedDict
+from datetime import date, datetime
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # optional, the standard library serializer is used instead
+    orjson = None
+
+
+def dumps(obj, sort_keys=False):
+    """
+    Function to serialize chart specs and datasets to JSON, with orjson when
+    it is installed.
+
+    Parameters:
+    -----------
+        obj : object
+            Dicts, lists and scalars, including NumPy values and datetimes.
+        sort_keys : bool
+            Write dict keys in sorted order.
+
+    Returns:
+    --------
+        body : bytes
+            UTF-8 encoded JSON.
+    """
+    if orjson is not None:
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        if sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        return orjson.dumps(obj, default=_to_json, option=option)
+    return json.dumps(
+        obj, sort_keys=sort_keys, separators=(",", ":"), default=_to_json
+    ).encode()
+
+
+def loads(body):
+    """Function to parse JSON written by dumps."""
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def _to_json(obj):
+    """Function to convert what the json module cannot write, like orjson does."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def param_key(value):
+    """
+    Function to turn a plot argument into part of a cache key.
+
+    Dataframes and other data objects are views of the snapshot, so together
+    with the data version the identity of the object is enough to tell them
+    apart without hashing their contents.
+
+    Parameters:
+    -----------
+        value : object
+            Positional or keyword argument of a plot function.
+
+    Returns:
+    --------
+        key : hashable
+            Hashable stand-in for the argument.
+    """
+    if isinstance(value, (list, tuple)):
+        return tuple(param_key(i) for i in value)
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return value
+    return (type(value).__name__, id(value))
+
+
+def content_key(value, memo):
+    """
+    Function to turn a plot argument into a stand-in that is the same in
+    every process, unlike the identity param_key relies on.
+
+    Data objects are stood in for by a hash of their pickle, so equal data
+    pickled differently only ever causes a miss, never a wrong hit.
+
+    Parameters:
+    -----------
+        value : object
+            Positional or keyword argument of a plot function.
+        memo : dict
+            id -> (object, hash) of the objects hashed so far, kept per data
+            version so each view of a snapshot is hashed once.
+
+    Returns:
+    --------
+        key : str
+            Text stand-in for the argument.
+    """
+    if isinstance(value, (list, tuple)):
+        return "[" + ",".join(content_key(i, memo) for i in value) + "]"
+    if value is None or isinstance(value, (str, int, float, bool)):
+        return repr(value)
+    if id(value) not in memo:
+        digest = hashlib.md5(pickle.dumps(value, protocol=4)).hexdigest()
+        # holding the object keeps its id from being reused
+        memo[id(value)] = (value, digest)
+    return f"{type(value).__name__}:{memo[id(value)][1]}"
+
+
+def _use_urls(node, urls):
+    """Function to point {"name": ...} data references at dataset URLs."""
+    if isinstance(node, list):
+        return [_use_urls(i, urls) for i in node]
+    if not isinstance(node, dict):
+        return node
+    if set(node) == {"name"} and node["name"] in urls:
+        return {"url": urls[node["name"]], "format": {"type": "json"}}
+    return {k: _use_urls(v, urls) for k, v in node.items() if k != "datasets"}
+
+
+# marks drawing one independent mark per row, so identical rows overlap exactly
+DEDUP_MARKS = {"circle", "point", "square", "tick", "rule", "text", "rect", "line"}
+
+# transforms and encodings whose result depends on how many rows there are
+ROW_COUNTING = {"aggregate", "joinaggregate", "window", "stack", "bin", "density"}
+
+_DATUM = re.compile(r"""datum(?:\.(\w+)|\[["'](.+?)["']\])""")
+
+
+def _strings(node, found):
+    """Function to collect every string of a spec, and the datum fields of expressions."""
+    if isinstance(node, list):
+        for i in node:
+            _strings(i, found)
+    elif isinstance(node, dict):
+        for k, v in node.items():
+            if k != "datasets":
+                found.add(k)
+                _strings(v, found)
+    elif isinstance(node, str):
+        found.add(node)
+        for attr, item in _DATUM.findall(node):
+            found.add(attr or item)
+    return found
+
+
+def _marks(node, found):
+    """Function to collect the mark types of a spec, composite or layered."""
+    if isinstance(node, list):
+        for i in node:
+            _marks(i, found)
+    elif isinstance(node, dict):
+        for k, v in node.items():
+            if k == "mark":
+                found.add(v["type"] if isinstance(v, dict) else v)
+            elif k != "datasets":
+                _marks(v, found)
+    return found
+
+
+def _rename(node, names):
+    """Function to point {"name": ...} data references at renamed datasets."""
+    if isinstance(node, list):
+        return [_rename(i, names) for i in node]
+    if not isinstance(node, dict):
+        return node
+    if set(node) == {"name"} and node["name"] in names:
+        return {"name": names[node["name"]]}
+    return {k: _rename(v, names) for k, v in node.items()}
+
+
+def shape(spec):
+    """
+    Function to trim the inline datasets of a spec down to what it draws.
+
+    Columns never named in the spec are dropped. When every mark is drawn
+    once per row and nothing counts rows, repeated rows are dropped too.
+    Trimmed datasets are renamed after their new contents, the way altair
+    names them.
+
+    Parameters:
+    -----------
+        spec : dict
+            Vega-Lite spec with top-level datasets.
+
+    Returns:
+    --------
+        spec : dict
+            Spec with trimmed datasets.
+        saved : int
+            Bytes of JSON dataset rows saved.
+    """
+    datasets = spec.get("datasets")
+    if not datasets:
+        return spec, 0
+
+    used = _strings(spec, set())
+    dedup = _marks(spec, set()) <= DEDUP_MARKS and not (
+        used & ROW_COUNTING or "count()" in used
+    )
+
+    shaped, names, saved = {}, {}, 0
+    for name, values in datasets.items():
+        rows = [{k: v for k, v in row.items() if k in used} for row in values]
+        if dedup:
+            rows = list({dumps(row, sort_keys=True): row for row in rows}.values())
+
+        before = len(dumps(values))
+        after = dumps(rows, sort_keys=True)
+        saved += before - len(after)
+
+        new_name = "data-" + hashlib.md5(after).hexdigest()
+        names[name] = new_name
+        shaped[new_name] = rows
+
+    spec = _rename(spec, names)
+    spec["datasets"] = shaped
+    return spec, saved
+
+
+class DatasetStore:
+    """
+    Datasets of rendered charts, published once per data version.
+
+    Altair names the inline datasets of a spec after a hash of their rows, so
+    charts drawn from the same rows share a name. publish moves them out of
+    the spec into the store and points the spec at a versioned URL instead,
+    which the browser downloads once for every chart using it.
+
+    The datasets of the previous version are kept too, so pages drawn just
+    before a refresh can still fetch theirs.
+
+    With a shared cache, datasets are stored there as well, so a worker
+    process can serve the datasets of charts another one rendered.
+
+    Parameters:
+    -----------
+        prefix : str
+            URL path the datasets are served from.
+        shared : SharedCache, optional
+            Cache shared with the other processes of the server.
+    """
+
+    def __init__(self, prefix="/data/", shared=None):
+        self.prefix = prefix
+        self.shared = shared
+        self.version = None
+        self.previous = None
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def _switch(self, version):
+        """Function to make version the current one, dropping all but the previous."""
+        if version in (self.version, self.previous):
+            return
+        self.previous, self.version = self.version, version
+        self._versions = {
+            v: self._versions.get(v, {}) for v in (self.previous, self.version)
+        }
+
+    def url(self, version, name):
+        return f"{self.prefix}{version}/{name}.json"
+
+    def publish(self, version, spec):
+        """
+        Function to move the inline datasets of a spec into the store.
+
+        Parameters:
+        -----------
+            version : str
+                Data version of the snapshot the spec was drawn from.
+            spec : dict
+                Vega-Lite spec with top-level datasets.
+
+        Returns:
+        --------
+            spec : dict
+                Spec reading its data from dataset URLs.
+        """
+        datasets = spec.get("datasets")
+        if not datasets:
+            return spec
+
+        added = {}
+        with self._lock:
+            self._switch(version)
+            store = self._versions[version]
+            for name, values in datasets.items():
+                if name not in store:
+                    store[name] = added[name] = dumps(values)
+
+        if self.shared is not None:
+            for name, body in added.items():
+                self.shared.put(f"data:{version}/{name}", body)
+
+        urls = {name: self.url(version, name) for name in datasets}
+        return _use_urls(spec, urls)
+
+    def items(self):
+        """Function to list the (name, JSON body) of every dataset of the current version."""
+        with self._lock:
+            return list(self._versions.get(self.version, {}).items())
+
+    def get(self, version, name):
+        """Function to return the JSON body of a dataset, or None."""
+        with self._lock:
+            body = self._versions.get(version, {}).get(name)
+        if body is None and self.shared is not None:
+            body = self.shared.get(f"data:{version}/{name}")
+        return body
+
+
+class RenderedChart:
+    """
+    A rendered chart: its Vega-Lite spec, and what shaping it saved.
+
+    Parameters:
+    -----------
+        spec : dict
+            Vega-Lite spec of the chart.
+        saved : int
+            Bytes of data rows trimmed from the spec by shape.
+    """
+
+    def __init__(self, spec, saved=0):
+        self.spec = spec
+        self.saved = saved
+
+
+class RenderCache:
+    """
+    Size-bounded LRU cache of rendered charts.
+
+    Charts are keyed by (plot function, parameters, data version) and hold
+    their Vega-Lite spec.
+    The cache holds at most two data versions: rendering with a new version
+    drops every entry but those of the version it replaces, which requests
+    started before a refresh may still be rendering from.
+
+    With a shared cache, charts missing from memory are looked up there
+    before being rendered, and stored there once rendered, so every worker
+    process renders each chart once between them. Specs are shared with
+    their datasets inline and published to this process's store on a hit.
+
+    Parameters:
+    -----------
+        maxsize : int
+            Maximum number of rendered charts kept.
+        datasets : DatasetStore, optional
+            Store the chart data is published to instead of being inlined.
+        shared : SharedCache, optional
+            Cache shared with the other processes of the server.
+    """
+
+    def __init__(self, maxsize=128, datasets=None, shared=None):
+        self.maxsize = maxsize
+        self.datasets = datasets
+        self.shared = shared
+        self._memo = {}
+        self.version = None
+        self.previous = None
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def _switch(self, version):
+        """Function to make version the current one, dropping all but the previous."""
+        if version in (self.version, self.previous):
+            return
+        self.previous, self.version = self.version, version
+        for key in list(self._entries):
+            if key[0] not in (self.previous, self.version):
+                del self._entries[key]
+        self._memo = {}
+
+    def render(self, version, plot, *args, **kwargs):
+        """
+        Function to return a rendered chart, building it on a cache miss.
+
+        Parameters:
+        -----------
+            version : str
+                Data version of the snapshot the arguments come from.
+            plot : function
+                plot_* function returning an altair.Chart.
+            *args, **kwargs
+                Arguments passed on to plot.
+
+        Returns:
+        --------
+            chart : RenderedChart
+                Vega-Lite spec (dict) of the chart and the bytes shape saved.
+        """
+        key = (
+            version,
+            plot.__module__,
+            plot.__qualname__,
+            param_key(args),
+            param_key(tuple(sorted(kwargs.items()))),
+        )
+
+        with self._lock:
+            self._switch(version)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        spec, saved = self._shaped(version, plot, args, kwargs)
+        if self.datasets is not None:
+            spec = self.datasets.publish(version, spec)
+        chart = RenderedChart(spec, saved)
+
+        with self._lock:
+            if version in (self.previous, self.version):
+                self._entries[key] = chart
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+
+        return chart
+
+    def _shaped(self, version, plot, args, kwargs):
+        """Function to render and shape a spec, or read it from the shared cache."""
+        if self.shared is None:
+            return shape(plot(*args, **kwargs).to_dict())
+
+        with self._lock:
+            memo = self._memo
+        shared_key = hashlib.md5(
+            "|".join(
+                [
+                    version,
+                    plot.__module__,
+                    plot.__qualname__,
+                    content_key(args, memo),
+                    content_key(sorted(kwargs.items()), memo),
+                ]
+            ).encode()
+        ).hexdigest()
+
+        body = self.shared.get(shared_key)
+        if body is not None:
+            spec, saved = loads(body)
+            return spec, saved
+
+        spec, saved = shape(plot(*args, **kwargs).to_dict())
+        self.shared.put(shared_key, dumps([spec, saved]))
+        return spec, saved
+
+    def savings(self):
+        """Function to report the bytes shape trimmed, per plot function."""
+        # charts of the version replaced would count twice
+        with self._lock:
+            entries = list(self._entries.items())
+            version = self.version
+        report = {}
+        for (chart_version, _, qualname, _, _), chart in entries:
+            if chart_version == version:
+                report[qualname] = report.get(qualname, 0) + chart.saved
+        return report
+
+    def spec(self, version, plot, *args, **kwargs):
+        """Function to return only the Vega-Lite spec of render."""
+        return self.render(version, plot, *args, **kwargs).spec
+
+    def warm(self, version, jobs, background=False):
+        """
+        Function to render charts ahead of time, so later requests for them
+        are served from memory.
+
+        Parameters:
+        -----------
+            version : str
+                Data version of the snapshot the arguments come from.
+            jobs : list
+                (plot, args) or (plot, args, kwargs) tuples, one per chart.
+            background : bool
+                Render in a daemon thread instead of blocking.
+
+        Returns:
+        --------
+            thread : threading.Thread or None
+                The rendering thread when background is set.
+        """
+
+        def run():
+            for plot, args, *kwargs in jobs:
+                self.render(version, plot, *args, **(kwargs[0] if kwargs else {}))
+
+        if not background:
+            run()
+            return None
+
+        thread = threading.Thread(target=run, name="chart-warmup", daemon=True)
+        thread.start()
+        return thread
@@ -0,0 +1,159 @@
+import gzip
+import threading
+from collections import OrderedDict
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:  # optional, responses are gzipped instead
+    brotli = None
+
+# types worth compressing; images and fonts already are
+COMPRESSIBLE = {
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+}
+
+# responses browsers may keep this long, in seconds, are served from versioned URLs
+STATIC_MAX_AGE = 24 * 60 * 60
+
+
+def compress(body, encoding, level=6):
+    """
+    Function to compress a response body.
+
+    Parameters:
+    -----------
+        body : bytes
+            Uncompressed body.
+        encoding : str
+            "br" or "gzip".
+        level : int
+            gzip level; brotli quality is scaled down from it, as its
+            higher levels are too slow to run on a request.
+
+    Returns:
+    --------
+        body : bytes
+            Compressed body.
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=min(level, 5))
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+
+class Compressor:
+    """
+    Compression of the responses of a Flask server, brotli when the client
+    and the server both support it and gzip otherwise.
+
+    Responses with an ETag only change with the code or the data version,
+    and those browsers may cache for a day or more are fingerprinted
+    bundles, so their compressed bodies are kept per URL and ETag and
+    reused until the cache is full.
+
+    Parameters:
+    -----------
+        threshold : int
+            Smallest body, in bytes, that is compressed.
+        level : int
+            Compression level, see compress.
+        maxsize : int
+            Maximum number of compressed bodies kept.
+    """
+
+    def __init__(self, threshold=500, level=6, maxsize=128):
+        self.threshold = threshold
+        self.level = level
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._bodies = OrderedDict()
+        self._lock = threading.Lock()
+
+    def encoding(self):
+        """Function to pick the encoding of the current request, or None."""
+        accepted = request.accept_encodings
+        if brotli is not None and accepted["br"]:
+            return "br"
+        if accepted["gzip"]:
+            return "gzip"
+        return None
+
+    def compress(self, response):
+        """
+        Function to compress a response in place, when it is worth it.
+
+        Parameters:
+        -----------
+            response : flask.Response
+                Response about to be sent.
+
+        Returns:
+        --------
+            response : flask.Response
+                The same response.
+        """
+        if (
+            response.status_code != 200
+            or response.mimetype not in COMPRESSIBLE
+            or "Content-Encoding" in response.headers
+        ):
+            return response
+        response.vary.add("Accept-Encoding")
+        encoding = self.encoding()
+        if encoding is None:
+            return response
+
+        etag, _ = response.get_etag()
+        static = etag or (response.cache_control.max_age or 0) >= STATIC_MAX_AGE
+        # ETags only name a version of one URL
+        key = (request.full_path, etag, encoding) if static else None
+        with self._lock:
+            body = self._bodies.get(key)
+            if body is not None:
+                self._bodies.move_to_end(key)
+                self.hits += 1
+
+        if body is None:
+            # files are streamed from disk unless read here
+            response.direct_passthrough = False
+            data = response.get_data()
+            if len(data) < self.threshold:
+                return response
+            body = compress(data, encoding, self.level)
+            if key is not None:
+                with self._lock:
+                    self.misses += 1
+                    self._bodies[key] = body
+                    while len(self._bodies) > self.maxsize:
+                        self._bodies.popitem(last=False)
+
+        elif response.direct_passthrough:
+            # the file the body would have been streamed from is not needed
+            response.response.close()
+
+        response.set_data(body)
+        response.headers["Content-Encoding"] = encoding
+        if etag:
+            # the same ETag names every encoding, so it can only be weak
+            response.set_etag(etag, weak=True)
+        return response
+
+    def register(self, server):
+        """
+        Function to compress every response of a Flask server. Register it
+        before other after_request hooks, which Flask runs in reverse order,
+        so it sees the headers they set.
+
+        Parameters:
+        -----------
+            server : flask.Flask
+                Server of the Dash app.
+        """
+        server.after_request(self.compress)
@@ -0,0 +1,324 @@
+import argparse
+import html
+import json
+import os
+import re
+
+import jinja2
+
+try:
+    import app as dashboard
+    from cache import DatasetStore, dumps, shape
+    from runtime import VegaRuntime
+    from sheworewhat import WardrobeDataset, plot_heatmap
+except ImportError:  # run from the repository root as src.export
+    from src import app as dashboard
+    from src.cache import DatasetStore, dumps, shape
+    from src.runtime import VegaRuntime
+    from src.sheworewhat import WardrobeDataset, plot_heatmap
+
+
+ASSETS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "assets")
+
+# sections that need the Dash server to answer their callbacks
+LIVE_ONLY = {"whatif"}
+
+VOID_TAGS = {"br", "hr", "img"}
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="utf-8">
+  <title>{{ title }}</title>
+  <link rel="icon" href="assets/favicon.ico">
+{%- for url in stylesheets %}
+  <link rel="stylesheet" href="{{ url }}">
+{%- endfor %}
+{%- for url in scripts %}
+  <script type="text/javascript" src="{{ url }}"></script>
+{%- endfor %}
+</head>
+<body>
+{{ body }}
+<script>
+  // charts are embedded the first time their section opens, like the live app
+  const views = {};
+  const signals = {};
+
+  function embed(el) {
+    return fetch(el.dataset.spec)
+      .then(function (response) { return response.json(); })
+      .then(function (spec) {
+        const values = Object.assign({}, (spec.usermeta || {}).signals, signals[el.id]);
+        const patch = function (vgSpec) {
+          vgSpec.signals = (vgSpec.signals || []).concat(
+            Object.keys(values).map(function (name) {
+              return {name: name, value: values[name]};
+            })
+          );
+          return vgSpec;
+        };
+        return vegaEmbed(el, spec, {patch: patch});
+      })
+      .then(function (result) {
+        if (views[el.id]) {
+          views[el.id].finalize();
+        }
+        views[el.id] = result.view;
+      })
+      .catch(console.error);
+  }
+
+  document.querySelectorAll("details").forEach(function (section) {
+    section.addEventListener("toggle", function () {
+      if (!section.open) {
+        return;
+      }
+      section.querySelectorAll(".vega-chart:not([data-embedded])").forEach(function (el) {
+        el.dataset.embedded = "true";
+        embed(el);
+      });
+    });
+  });
+
+  // item_name value is [position, name], with a heatmap prebuilt per position
+  const itemName = document.getElementById("item_name");
+  itemName.addEventListener("change", function () {
+    const value = JSON.parse(itemName.value);
+    const heatmap = document.getElementById("heatmap_item");
+    heatmap.dataset.spec = "specs/heatmap_item-" + value[0] + ".json";
+    if (heatmap.dataset.embedded) {
+      embed(heatmap);
+    }
+    signals.top10 = {highlight: value[1]};
+    if (views.top10) {
+      views.top10.signal("highlight", value[1]).runAsync();
+    }
+  });
+</script>
+</body>
+</html>
+"""
+
+
+def _css(style):
+    """Function to write a Dash style dict as an inline CSS declaration."""
+    return "; ".join(
+        "{}: {}".format(re.sub("([A-Z])", r"-\1", k).lower(), v)
+        for k, v in style.items()
+    )
+
+
+def _tag(name, children, **attrs):
+    """Function to write one HTML element, dropping empty attributes."""
+    attrs = "".join(
+        f' {k.replace("_", "-")}="{html.escape(str(v))}"'
+        for k, v in attrs.items()
+        if v is not None
+    )
+    if name in VOID_TAGS:
+        return f"<{name}{attrs}>"
+    return f"<{name}{attrs}>{children}</{name}>"
+
+
+def to_html(component):
+    """
+    Function to write a Dash layout as static HTML.
+
+    Bootstrap layout components become the divs they render to, accordion
+    items become <details> elements, charts become placeholders pointing at
+    their spec file and single-select dropdowns become <select> elements.
+    Stores and the controls of LIVE_ONLY sections are left out.
+
+    Parameters:
+    -----------
+        component : Dash component, list, str or number
+            Layout or part of it.
+
+    Returns:
+    --------
+        markup : str
+            HTML of the component.
+    """
+    if component is None:
+        return ""
+    if isinstance(component, (list, tuple)):
+        return "".join(to_html(c) for c in component)
+    if not hasattr(component, "_type"):
+        return html.escape(str(component))
+
+    kind = f"{component._namespace}.{component._type}"
+    props = {p: getattr(component, p, None) for p in component._prop_names}
+    if kind == "dash_bootstrap_components.AccordionItem" and (
+        props["item_id"] in LIVE_ONLY
+    ):
+        return ""
+
+    children = to_html(props.get("children"))
+    style = _css(props["style"]) if props.get("style") else None
+    classes = [props["className"]] if props.get("className") else []
+
+    if kind == "dash_bootstrap_components.Container":
+        classes.insert(0, "container-fluid" if props["fluid"] else "container")
+        return _tag(
+            "div", children, id=props["id"], style=style, **{"class": " ".join(classes)}
+        )
+    if kind == "dash_bootstrap_components.Row":
+        classes.insert(0, "row")
+        return _tag("div", children, style=style, **{"class": " ".join(classes)})
+    if kind == "dash_bootstrap_components.Col":
+        width = props["width"]
+        if isinstance(width, dict):
+            width = width.get("size")
+        classes.insert(0, f"col-{width}" if width else "col")
+        return _tag("div", children, style=style, **{"class": " ".join(classes)})
+    if kind == "dash_bootstrap_components.Accordion":
+        return _tag("div", children, **{"class": "accordion"})
+    if kind == "dash_bootstrap_components.AccordionItem":
+        title = _tag(
+            "summary", html.escape(props["title"]), **{"class": "accordion-button"}
+        )
+        body = _tag("div", children, **{"class": "accordion-body"})
+        return _tag(
+            "details", title + body, id=props["item_id"], **{"class": "accordion-item"}
+        )
+    if kind == "dash_core_components.Dropdown" and not props["multi"]:
+        options = [
+            o if isinstance(o, dict) else {"label": o, "value": o}
+            for o in props["options"]
+        ]
+        options = "".join(
+            _tag(
+                "option",
+                html.escape(str(o["label"])),
+                value=json.dumps(o["value"]),
+                selected="selected" if o["value"] == props["value"] else None,
+            )
+            for o in options
+        )
+        return _tag("select", options, id=props["id"], **{"class": "form-select"})
+    if component._namespace != "dash_html_components":
+        return ""
+
+    chart_id = props.get("id")
+    if isinstance(chart_id, dict):
+        if chart_id.get("type") != "vega-chart":
+            return ""
+        index = chart_id["index"]
+        return _tag(
+            "div",
+            "",
+            id=index,
+            style=style,
+            data_spec=f"specs/{index}.json",
+            **{"class": "vega-chart"},
+        )
+
+    src = props.get("src")
+    if src and src.startswith("/assets/"):
+        src = src[1:]
+    return _tag(
+        component._type.lower(),
+        children,
+        id=chart_id,
+        style=style,
+        href=props.get("href"),
+        src=src,
+        alt=props.get("alt"),
+        **{"class": " ".join(classes) or None},
+    )
+
+
+def export(out_dir, data=None):
+    """
+    Function to render the dashboard of the current snapshot into a static
+    site: index.html, chart specs, their datasets and the Vega runtime.
+
+    Parameters:
+    -----------
+        out_dir : str
+            Directory the site is written to.
+        data : WardrobeDataset, optional
+            Snapshot to render. Loaded from the closet CSV and sheet when
+            not given.
+
+    Returns:
+    --------
+        files : int
+            Number of files written.
+        saved : dict
+            Chart name -> bytes of data rows shape trimmed from its spec.
+    """
+    if data is None:
+        data = WardrobeDataset.load()
+    datasets = DatasetStore("data/")
+    runtime = VegaRuntime(prefix="vendor/")
+    files = {}
+    saved = {}
+
+    def add_spec(name, plot, *args):
+        spec, saved[name] = shape(plot(*args).to_dict())
+        spec = datasets.publish(data.version, spec)
+        files[f"specs/{name}.json"] = dumps(spec)
+
+    for renders in dashboard.SECTIONS.values():
+        for chart_id, chart in renders.items():
+            add_spec(chart_id, *chart(data))
+
+    # one heatmap per item_name option; the default one doubles as the first
+    for z in range(len(data.top_id)):
+        add_spec(f"heatmap_item-{z}", plot_heatmap, data.top_id, data.heatmap_rows, z)
+    files["specs/heatmap_item.json"] = files["specs/heatmap_item-0.json"]
+
+    for name, body in datasets.items():
+        files[f"data/{data.version}/{name}.json"] = body
+
+    stylesheets = list(dashboard.STYLESHEETS)
+    for name in sorted(os.listdir(ASSETS_DIR)):
+        path = os.path.join(ASSETS_DIR, name)
+        if os.path.isfile(path) and not name.endswith(".js"):
+            with open(path, "rb") as f:
+                files[f"assets/{name}"] = f.read()
+            if name.endswith(".css"):
+                stylesheets.append(f"assets/{name}")
+
+    for name, path in runtime.paths.items():
+        with open(path, "rb") as f:
+            files[f"vendor/{name}"] = f.read()
+
+    page = jinja2.Environment().from_string(PAGE_TEMPLATE)
+    files["index.html"] = page.render(
+        title=dashboard.TITLE,
+        stylesheets=stylesheets,
+        scripts=runtime.urls,
+        body=to_html(dashboard.serve_layout(data)),
+    ).encode()
+
+    for name, body in files.items():
+        path = os.path.join(out_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(body)
+
+    return len(files), saved
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="sheworewhat export",
+        description="Render the dashboard into a static site.",
+    )
+    parser.add_argument("out_dir", nargs="?", default="site")
+    args = parser.parse_args(argv)
+
+    n, saved = export(args.out_dir)
+    for name, size in sorted(saved.items(), key=lambda x: -x[1]):
+        if size:
+            print(f"{name}: {size / 1024:.1f} kB of data trimmed")
+    print(
+        f"Wrote {n} files to {args.out_dir}, {sum(saved.values()) / 1024:.1f} kB trimmed"
+    )
+
+
+if __name__ == "__main__":
+    main()
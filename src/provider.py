@@ -0,0 +1,240 @@
+import os
+import pickle
+import threading
+import time
+import warnings
+
+try:
+    import fcntl
+except ImportError:  # not on Windows, where every process refreshes its own copy
+    fcntl = None
+
+# files of shared_dir: held by the process refreshing, and what it loaded
+LOCK_FILE = "refresh.lock"
+SNAPSHOT_FILE = "snapshot.pickle"
+
+
+class DataProvider:
+    """
+    Wardrobe dataset loaded the first time it is asked for, so creating the
+    app does not wait for the sheet to download.
+
+    With an interval or files to watch, a refresh thread reloads the
+    dataset when the interval has passed or one of the files changed. The
+    new dataset is prepared by the listeners on that thread, then swapped
+    in with a single assignment: requests never wait for a refresh and
+    always see either the old dataset or the new one. The dataset it
+    replaced is kept, so pages drawn from it can keep asking for it.
+
+    With a shared_dir, only the process holding a lock in it reloads; it
+    leaves each new dataset there, and the other processes swap that in
+    instead of loading the sources again. When it exits, another one takes
+    the lock over.
+
+    Parameters:
+    -----------
+        load : function
+            Function returning a WardrobeDataset.
+        interval : float, optional
+            Seconds between reloads.
+        watch : list
+            Paths of files whose changes trigger a reload.
+        poll : float
+            Seconds between checks of the watched files, or of the dataset
+            left in shared_dir.
+        shared_dir : str, optional
+            Directory only this user can read, shared by the processes of
+            the server.
+
+    Attributes:
+    -----------
+        updated : float
+            Time the current dataset was swapped in, in seconds since the epoch.
+    """
+
+    def __init__(self, load, interval=None, watch=(), poll=2.0, shared_dir=None):
+        self._load = load
+        self._data = None
+        self._previous = None
+        self.updated = None
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+        self._listeners = []
+        self.interval = interval
+        self.watch = list(watch)
+        self.poll = poll
+        self.shared_dir = shared_dir
+        self._thread = None
+        self._pid = None
+        self._leader = None
+        self._lock_file = None
+
+    @property
+    def loaded(self):
+        return self._data is not None
+
+    def on_load(self, listener):
+        """
+        Function to call listener(data) with every dataset loaded, before
+        requests are served from it.
+        """
+        self._listeners.append(listener)
+
+    def get(self, version=None):
+        """
+        Function to return the dataset, loading it on first use.
+
+        Parameters:
+        -----------
+            version : str, optional
+                Data version a page was drawn from. Its dataset is returned
+                while it is the current or the replaced one, the current
+                dataset once it is older than that.
+
+        Returns:
+        --------
+            data : WardrobeDataset
+                Dataset shared by every request.
+        """
+        data = self._data
+        if data is None:
+            with self._lock:
+                if self._data is None:
+                    data = self._load()
+                    for listener in self._listeners:
+                        listener(data)
+                    self._data, self.updated = data, time.time()
+                data = self._data
+        if version is None or version == data.version:
+            return data
+        previous = self._previous
+        if previous is not None and previous.version == version:
+            return previous
+        return data
+
+    def refresh(self):
+        """
+        Function to reload the dataset and swap it in once it is prepared.
+
+        Returns:
+        --------
+            changed : bool
+                Whether a new data version was swapped in.
+        """
+        with self._refresh_lock:
+            data = self._load()
+            if self._data is not None and data.version == self._data.version:
+                return False
+            self._swap(data)
+            return True
+
+    def _swap(self, data):
+        """Function to prepare a new dataset and swap it in."""
+        for listener in self._listeners:
+            listener(data)
+        self._previous = self._data
+        self._data, self.updated = data, time.time()
+
+    def _lead(self):
+        """
+        Function to return whether this process is the one reloading the
+        dataset, taking the lock of shared_dir when nobody holds it.
+        """
+        if self.shared_dir is None or fcntl is None or self._leader == os.getpid():
+            return True
+        handle = open(os.path.join(self.shared_dir, LOCK_FILE), "a")
+        try:
+            fcntl.flock(handle, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            handle.close()
+            return False
+        # held until the process exits
+        self._lock_file, self._leader = handle, os.getpid()
+        return True
+
+    def _publish(self, data):
+        """Function to leave a dataset in shared_dir for the other processes."""
+        path = os.path.join(self.shared_dir, SNAPSHOT_FILE)
+        partial = f"{path}.{os.getpid()}"
+        with open(partial, "wb") as f:
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        # readers see the old file or the new one, never half of it
+        os.replace(partial, path)
+
+    def _adopt(self, seen):
+        """
+        Function to swap in the dataset left in shared_dir, when it was left
+        after the one seen.
+
+        Parameters:
+        -----------
+            seen : float
+                Modification time of the last dataset left that was looked at.
+
+        Returns:
+        --------
+            seen : float
+                Modification time of the dataset left now.
+        """
+        path = os.path.join(self.shared_dir, SNAPSHOT_FILE)
+        try:
+            stamp = os.path.getmtime(path)
+        except OSError:
+            return seen
+        if stamp <= seen:
+            return seen
+        # the directory is private, so only this server can have written it
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        with self._refresh_lock:
+            if self._data is None or data.version != self._data.version:
+                self._swap(data)
+        return stamp
+
+    def _stamps(self):
+        """Function to return the modification time of every watched file."""
+        return [
+            os.path.getmtime(path) if os.path.exists(path) else None
+            for path in self.watch
+        ]
+
+    def start(self):
+        """
+        Function to start the refresh thread of this process, once. Threads
+        don't survive a fork, so a forked worker starts its own.
+        """
+        if self._pid == os.getpid() or not (self.interval or self.watch):
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(
+                target=self._run, name="data-refresh", daemon=True
+            )
+            self._thread.start()
+
+    def _run(self):
+        stamps = self._stamps()
+        due = time.monotonic() + self.interval if self.interval else None
+        # datasets left before this one was loaded are older
+        seen = self.updated or time.time()
+        polled = self.watch or self.shared_dir is not None
+        wait = min(([self.poll] if polled else []) + [self.interval or self.poll])
+        while True:
+            time.sleep(wait)
+            try:
+                if not self._lead():
+                    seen = self._adopt(seen)
+                    continue
+                new_stamps = self._stamps()
+                if new_stamps == stamps and (due is None or time.monotonic() < due):
+                    continue
+                stamps = new_stamps
+                if self.interval:
+                    due = time.monotonic() + self.interval
+                if self.refresh() and self.shared_dir is not None:
+                    self._publish(self._data)
+            except Exception as e:
+                # keep serving the current dataset and try again next time
+                warnings.warn(f"Refreshing the data failed: {e!r}")
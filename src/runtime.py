@@ -0,0 +1,119 @@
+import fnmatch
+import hashlib
+import os
+import re
+
+from flask import abort, send_file
+
+VENDOR_DIR = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "assets", "vendor"
+)
+
+# load order matters: vega-embed expects vega and vega-lite to be defined
+VEGA_FILES = ["vega-5.21.0.js", "vega-lite-4.17.0.js", "vega-embed-6.20.0.js"]
+
+
+def fingerprint(path, length=12):
+    """
+    Function to name a file after a hash of its contents.
+
+    Parameters:
+    -----------
+        path : str
+            Path of the file.
+        length : int
+            Number of hex digits of the hash kept.
+
+    Returns:
+    --------
+        name : str
+            File name with the hash before the extension,
+            e.g. vega-5.21.0.1a2b3c4d5e6f.js
+    """
+    with open(path, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()[:length]
+    root, ext = os.path.splitext(os.path.basename(path))
+    return f"{root}.{digest}{ext}"
+
+
+def fingerprint_tree(directory, include=("*",), length=12):
+    """
+    Function to hash the files under a directory, e.g. to tell deployments
+    of the app apart.
+
+    Parameters:
+    -----------
+        directory : str
+            Folder to hash, bytecode caches left out.
+        include : list
+            fnmatch patterns of the paths, relative to directory, hashed.
+        length : int
+            Number of hex digits of the hash kept.
+
+    Returns:
+    --------
+        digest : str
+            Hash of the paths and contents of the files.
+    """
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(directory):
+        dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+        for name in sorted(files):
+            path = os.path.join(root, name)
+            relpath = os.path.relpath(path, directory).replace(os.sep, "/")
+            if not any(fnmatch.fnmatch(relpath, pattern) for pattern in include):
+                continue
+            digest.update(relpath.encode())
+            with open(path, "rb") as f:
+                digest.update(f.read())
+    return digest.hexdigest()[:length]
+
+
+class VegaRuntime:
+    """
+    Vega, Vega-Lite and vega-embed served by the app instead of a CDN.
+
+    Files are published under content-hashed names, so a new bundle gets a
+    new URL and browsers can cache each one for good.
+
+    Parameters:
+    -----------
+        directory : str
+            Folder holding the bundles.
+        files : list
+            Bundle file names, in load order.
+        prefix : str
+            URL path the bundles are served from.
+    """
+
+    def __init__(self, directory=VENDOR_DIR, files=VEGA_FILES, prefix="/vendor/"):
+        self.prefix = prefix
+        self.paths = {
+            fingerprint(os.path.join(directory, f)): os.path.join(directory, f)
+            for f in files
+        }
+        self.urls = [prefix + name for name in self.paths]
+
+        # keep Dash from also including the bundles as plain assets
+        self.assets_ignore = "^({})$".format("|".join(re.escape(f) for f in files))
+
+    def register(self, server):
+        """
+        Function to add the route serving the bundles to a Flask server.
+
+        Parameters:
+        -----------
+            server : flask.Flask
+                Server of the Dash app.
+        """
+
+        def serve_vendor(name):
+            if name not in self.paths:
+                abort(404)
+            response = send_file(
+                self.paths[name], mimetype="text/javascript", max_age=31536000
+            )
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+            return response
+
+        server.add_url_rule(f"{self.prefix}<name>", "serve_vendor", serve_vendor)
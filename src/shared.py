@@ -0,0 +1,194 @@
+import os
+import sqlite3
+import threading
+import time
+import warnings
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+)
+"""
+
+
+# reads whose recency is remembered before being written in one go
+TOUCH_BATCH = 64
+
+
+def private_dir(path):
+    """
+    Function to create a directory only the current user can use, or make
+    sure an existing one is.
+
+    Parameters:
+    -----------
+        path : str
+            Directory for files other users must not read or plant.
+
+    Returns:
+    --------
+        path : str
+            The same path.
+    """
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    if hasattr(os, "getuid"):
+        st = os.stat(path)
+        if st.st_uid != os.getuid():
+            raise PermissionError(f"{path} belongs to another user")
+        if st.st_mode & 0o077:
+            os.chmod(path, 0o700)
+    return path
+
+
+class SharedCache:
+    """
+    Size-bounded cache in a SQLite file, shared by every process of the
+    server, so what one gunicorn worker renders the others can read
+    instead of rendering it again.
+
+    Entries are evicted least recently used first once the bodies add up
+    to more than max_bytes; reads are remembered and their recency written
+    in batches, so reading stays read-only. The cache only ever speeds
+    things up: when the file can't be used, every lookup misses and
+    nothing is stored.
+
+    Parameters:
+    -----------
+        path : str
+            SQLite file, created when missing. Keep it in a private_dir:
+            whatever it holds is served as is.
+        max_bytes : int
+            Most bytes of bodies kept.
+        namespace : str
+            Prefix of every key, e.g. the deployment, so a new version of
+            the code does not read what an old one stored.
+    """
+
+    def __init__(self, path, max_bytes=64 * 2**20, namespace=""):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+        self._inherited = []
+        self._touched = {}
+        self._lock = threading.Lock()
+        if hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self._forget)
+
+    def _forget(self):
+        # closing a connection opened before a fork can release the locks
+        # the parent holds, so the child keeps it open and never uses it
+        self._inherited.append(self._local)
+        self._local = threading.local()
+        self._touched = {}
+
+    def _connect(self):
+        """Function to return the connection of this thread."""
+        local = self._local
+        if getattr(local, "db", None) is None:
+            db = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(SCHEMA)
+            local.db = db
+        return local.db
+
+    def _write_touched(self, db):
+        """Function to write the recency of the entries read since last time."""
+        with self._lock:
+            touched, self._touched = self._touched, {}
+        if touched:
+            db.executemany(
+                "UPDATE entries SET used = ? WHERE key = ?",
+                [(used, key) for key, used in touched.items()],
+            )
+
+    def get(self, key):
+        """
+        Function to return the body stored under key.
+
+        Parameters:
+        -----------
+            key : str
+                Key the body was stored under.
+
+        Returns:
+        --------
+            body : bytes or None
+                Stored body, None on a miss.
+        """
+        key = self.namespace + key
+        try:
+            db = self._connect()
+            row = db.execute(
+                "SELECT body FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                with self._lock:
+                    self._touched[key] = time.time()
+                    flush = len(self._touched) >= TOUCH_BATCH
+                if flush:
+                    with db:
+                        db.execute("BEGIN IMMEDIATE")
+                        self._write_touched(db)
+        except sqlite3.Error as e:
+            warnings.warn(f"Shared cache {self.path} is unavailable: {e}")
+            row = None
+
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return row[0]
+
+    def put(self, key, body):
+        """
+        Function to store a body under key, evicting old entries past max_bytes.
+
+        Parameters:
+        -----------
+            key : str
+                Key to store the body under.
+            body : bytes
+                Body to store.
+        """
+        if len(body) > self.max_bytes:
+            return
+        key = self.namespace + key
+        try:
+            db = self._connect()
+            with db:
+                db.execute("BEGIN IMMEDIATE")
+                self._write_touched(db)
+                db.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                    (key, body, len(body), time.time()),
+                )
+                (total,) = db.execute("SELECT SUM(size) FROM entries").fetchone()
+                if total > self.max_bytes:
+                    # oldest first, until what is left fits
+                    db.execute(
+                        """
+                        DELETE FROM entries WHERE key IN (
+                            SELECT key FROM (
+                                SELECT key, SUM(size) OVER (ORDER BY used DESC) AS kept
+                                FROM entries
+                            ) WHERE kept > ?
+                        )
+                        """,
+                        (self.max_bytes,),
+                    )
+        except sqlite3.Error as e:
+            warnings.warn(f"Shared cache {self.path} is unavailable: {e}")
+
+    def clear(self):
+        """Function to drop every entry, of every namespace."""
+        try:
+            self._connect().execute("DELETE FROM entries")
+        except sqlite3.Error as e:
+            warnings.warn(f"Shared cache {self.path} is unavailable: {e}")
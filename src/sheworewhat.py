@@ -1,10 +1,189 @@
+import codecs
+import hashlib
+import io
+import time
+import warnings
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from datetime import datetime
+from functools import cached_property
+
 import pandas as pd
 import numpy as np
 import altair as alt
 import dash_bootstrap_components as dbc
 
+CLOSET_PATH = "data/ClosetData.csv"
+
+# clothes rented through Nuuly and the like, with the days each was worn
+RENTALS_PATH = "data/Rentals.xlsx"
+
+# Google Form responses, exported as CSV
+SHEET_URL = (
+    "https://docs.google.com/spreadsheets/d/"
+    "1TP7HQZxiP6as_HHexcwkmDTeXOQQOLbUesZjHwKA-Q4/export?format=csv&gid=1344494584"
+)
+
+color_aes = [
+    "#73de83",  # green
+    "#73d2de",  # light blue
+    "#7373de",  # lavender
+    "#b173de",  # purple
+    "#de73a5",  # magenta
+    "#dec773",  # gold
+]
+
+
+def assign_ids(closet):
+    """
+    Function to return stable item IDs for a raw closet dataframe.
+
+    IDs are read from the "ID" column of the CSV, so inserting or reordering
+    rows never changes an existing item's ID. Rows without an ID get the next
+    free numbers in file order; run persist_ids to write them to the CSV.
+    An ID given to several rows can't tell the wear log which item it
+    means, so it is an error.
+
+    Parameters:
+    -----------
+        closet : pandas.DataFrame
+            Dataframe as read from the closet CSV.
+
+    Returns:
+    --------
+        ids : pandas.Series
+            Integer ID per row.
+
+    Raises:
+    -------
+        ValueError
+            When rows share an ID, listing their line numbers in the CSV.
+    """
+    if "ID" not in closet:
+        # closets saved before IDs were persisted used row order
+        return pd.Series(range(len(closet)), index=closet.index, name="ID")
+
+    ids = closet["ID"].copy()
+    missing = ids.isna()
+    duplicated = ids.duplicated(keep=False) & ~missing
+    if duplicated.any():
+        # line 1 of the file is the header
+        lines = {
+            int(i): [int(n) + 2 for n in np.flatnonzero(ids == i)]
+            for i in ids[duplicated].unique()
+        }
+        raise ValueError(
+            "Closet items share an ID: "
+            + "; ".join(f"ID {i} on lines {lines[i]}" for i in lines)
+        )
+    if missing.any():
+        warnings.warn(
+            f"{missing.sum()} closet items have no ID yet, "
+            "run persist_ids to save the ones assigned"
+        )
+        start = 0 if missing.all() else int(ids.max()) + 1
+        ids[missing] = range(start, start + missing.sum())
+
+    return ids.astype(int)
+
+
+def persist_ids(path=CLOSET_PATH):
+    """
+    Function to write IDs for new items back to the closet CSV.
+
+    The file is only rewritten when some items had no ID, and then keeps
+    its encoding, line endings and every other value as it was written.
+
+    Parameters:
+    -----------
+        path : str
+            Path to CSV file containing closet information.
+
+    Returns:
+    --------
+        closet : pandas.DataFrame
+            Closet dataframe as text, with every "ID" filled in.
+    """
+    with open(path, "rb") as f:
+        raw = f.read()
+    encoding = "utf-8-sig" if raw.startswith(codecs.BOM_UTF8) else "utf-8"
+    newline = "\r\n" if b"\r\n" in raw else "\n"
+    # read as text, so 15 is not written back as 15.0
+    closet = pd.read_csv(
+        io.BytesIO(raw), dtype=str, keep_default_na=False, encoding=encoding
+    )
+
+    if "ID" in closet:
+        numbers = pd.to_numeric(closet["ID"].replace("", np.nan))
+    else:
+        numbers = pd.Series(np.nan, index=closet.index)
+    missing = numbers.isna()
+    if not missing.any():
+        return closet
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        ids = assign_ids(closet.assign(ID=numbers))
+    if "ID" not in closet:
+        closet.insert(0, "ID", "")
+    closet.loc[missing, "ID"] = ids[missing].astype(str)
+    text = closet.to_csv(index=False, lineterminator=newline)
+    if not raw.endswith(newline.encode()):
+        text = text[: -len(newline)]
+    with open(path, "w", encoding=encoding, newline="") as f:
+        f.write(text)
+
+    return closet
+
+
+def frame_hash(df):
+    """
+    Function to return a content hash of a dataframe.
+
+    Parameters:
+    -----------
+        df : pandas.DataFrame
+            Closet, wear log or any other snapshot to fingerprint.
+
+    Returns:
+    --------
+        digest : str
+            12 character hex digest of the column names and values.
+    """
+    digest = hashlib.sha1(",".join(map(str, df.columns)).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+
+    return digest.hexdigest()[:12]
+
+
+def snapshot_version(closet, df, rentals=None):
+    """
+    Function to return the version key of a closet + wear log snapshot.
+
+    Every derived cache, chart and response is keyed by this version.
+
+    Parameters:
+    -----------
+        closet : pandas.DataFrame
+            Dataframe obtained from closet_df.
+        df : pandas.DataFrame
+            Wear log obtained from fetch_data.
+        rentals : pandas.DataFrame, optional
+            Rentals obtained from rentals_df.
+
+    Returns:
+    --------
+        version : str
+            12 character hex digest of the snapshot hashes.
+    """
+    both = frame_hash(closet) + frame_hash(df)
+    if rentals is not None:
+        both += frame_hash(rentals)
+
+    return hashlib.sha1(both.encode()).hexdigest()[:12]
 
-def closet_df(path="../data/ClosetData.csv"):
+
+def closet_df(path=CLOSET_PATH):
     """
     Function to import CSV data and return df with unique identifiers.
 
@@ -24,8 +203,10 @@ def closet_df(path="../data/ClosetData.csv"):
 
     closet = pd.read_csv(path)
 
-    # create IDs per item
-    closet = closet.reset_index().rename(columns={"index": "ID"})
+    # stable IDs persisted in the CSV
+    ids = assign_ids(closet)
+    closet = closet.drop(columns="ID", errors="ignore")
+    closet.insert(0, "ID", ids)
 
     # format strings to create item name
     closet["Item"] = closet["Item"].map(str.title)
@@ -51,6 +232,201 @@ def closet_df(path="../data/ClosetData.csv"):
     return closet
 
 
+def fetch_data(url=SHEET_URL):
+    """
+    Function to fetch data from Google Sheet.
+
+    Parameters:
+    -----------
+        url : str
+            CSV export of the outfit log. Default is the Google Sheet.
+
+    Returns:
+    --------
+        df : pandas.DataFrame
+            Wear log containing one row per item worn: "Date", "variable"
+            (form question), "value" (form answer) and "ID".
+    """
+    df = pd.read_csv(url).drop("Timestamp", axis=1).melt("Date").dropna()
+
+    df["Date"] = pd.to_datetime(df["Date"])
+    df["ID"] = df.value.str.extract(r"(\d+)").astype(int)
+    df = df[df.variable != "Note"]  # drop notes to self
+
+    return df
+
+
+def rentals_df(path=RENTALS_PATH):
+    """
+    Function to import the rentals spreadsheet.
+
+    Parameters:
+    -----------
+        path : str
+            Path to the Excel file of rented items.
+
+    Returns:
+    --------
+        rentals : pandas.DataFrame
+            Dataframe containing "Item", "Category", "Sub-Category", "Color",
+            "Pattern", "Brand", "Month", "Retail", "Bought", "Worn" (days
+            worn as month/day text) and "Wears" (number of days worn).
+    """
+    rentals = pd.read_excel(path)
+
+    # one day is read as a date, several are kept as the text typed in
+    rentals["Worn"] = [
+        f"{d.month}/{d.day}" if isinstance(d, datetime) else "" if pd.isna(d) else d
+        for d in rentals["Worn"]
+    ]
+    rentals["Wears"] = [
+        len([d for d in worn.split(",") if d.strip()]) for worn in rentals["Worn"]
+    ]
+
+    return rentals
+
+
+def rental_stats(rentals):
+    """
+    Function to summarise the rented items.
+
+    Parameters:
+    -----------
+        rentals : pandas.DataFrame
+            Dataframe obtained from rentals_df.
+
+    Returns:
+    --------
+        stats : dict
+            Number of items rented and worn, times worn, retail value and
+            retail value per wear, and items rented per category.
+    """
+    retail = rentals["Retail"].sum()
+    wears = rentals["Wears"].sum()
+
+    return {
+        "items": len(rentals),
+        "worn_items": int((rentals["Wears"] > 0).sum()),
+        "wears": int(wears),
+        "retail_value": float(retail),
+        "retail_per_wear": round(float(retail / wears), 2) if wears else None,
+        "categories": rentals["Category"].value_counts().to_dict(),
+    }
+
+
+def timed(func, *args):
+    """
+    Function to call func(*args) and time it, in whichever thread or
+    process runs it.
+
+    Returns:
+    --------
+        result : object
+            What func returned.
+        seconds : float
+            Time the call took.
+    """
+    start = time.perf_counter()
+    result = func(*args)
+
+    return result, time.perf_counter() - start
+
+
+class CategoryIndex:
+    """
+    Row positions of every Category and Sub-Category in a closet dataframe.
+
+    The dataframe is sorted once by Category and Sub-Category, so every group
+    is a contiguous block of rows and each per-category view is a zero-copy
+    slice instead of a fresh boolean mask.
+
+    Parameters:
+    -----------
+        df : pandas.DataFrame
+            Dataframe obtained from closet_df or worn function.
+
+    Attributes:
+    -----------
+        df : pandas.DataFrame
+            The sorted dataframe that all slices refer to.
+        categories : dict
+            Category name -> slice of row positions in df.
+        subcategories : dict
+            (Category, Sub-Category) -> slice of row positions in df.
+    """
+
+    def __init__(self, df):
+        self.df = df.sort_values(["Category", "Sub-Category"], kind="mergesort")
+        self.df = self.df.reset_index(drop=True)
+
+        self.categories = {
+            name: slice(rows[0], rows[-1] + 1)
+            for name, rows in self.df.groupby("Category").indices.items()
+        }
+        self.subcategories = {
+            name: slice(rows[0], rows[-1] + 1)
+            for name, rows in self.df.groupby(
+                ["Category", "Sub-Category"]
+            ).indices.items()
+        }
+
+    def __getitem__(self, category):
+        return self.df.iloc[self.categories.get(category, slice(0, 0))]
+
+    def __iter__(self):
+        return iter(self.categories)
+
+    def sub(self, category, subcategory):
+        """
+        Function to return the rows of a single Sub-Category.
+
+        Parameters:
+        -----------
+            category : str
+                Category the Sub-Category belongs to, e.g. "Top".
+            subcategory : str
+                Sub-Category name, e.g. "Sweater".
+
+        Returns:
+        --------
+            df : pandas.DataFrame
+                View of the matching rows.
+        """
+        key = (category, subcategory)
+        return self.df.iloc[self.subcategories.get(key, slice(0, 0))]
+
+    def count(self, mask=None):
+        """
+        Function to count rows per Category, optionally only where mask holds.
+
+        Parameters:
+        -----------
+            mask : array-like of bool, optional
+                Row filter aligned with the sorted df, e.g.
+                index.df["Count"] == 0.
+
+        Returns:
+        --------
+            counts : pandas.DataFrame
+                Dataframe containing "Category" and "Count", leaving out
+                categories with no matching rows.
+        """
+        if mask is None:
+            mask = np.ones(len(self.df), dtype=bool)
+        # rows without a Category sort last, outside every block
+        matched = np.concatenate([[0], np.cumsum(np.asarray(mask, dtype=int))])
+        starts = np.array([rows.start for rows in self.categories.values()], dtype=int)
+        stops = np.array([rows.stop for rows in self.categories.values()], dtype=int)
+
+        counts = pd.DataFrame(
+            {
+                "Category": list(self.categories),
+                "Count": matched[stops] - matched[starts],
+            }
+        )
+        return counts[counts["Count"] > 0].reset_index(drop=True)
+
+
 def closet_cat(df):
     """
     Function to parse closet df into five distinct datasets
@@ -88,45 +464,38 @@ def closet_cat(df):
             Dataframe containing only top data.
 
     """
-    categories = ["top", "bottom", "fb", "outerwear", "acc", "shoes"]
-
-    for i in categories:
-        if i != "fb" or i != "acc":
-            globals()[f"{i}_df"] = df[df["Category"] == i.title()]
+    index = CategoryIndex(df)
 
-    # hardcode bc running into global var issue with these two (empty df)
-    acc_df = df[df["Category"] == "Accessory"]
-    fb_df = df[df["Category"] == "Full Body"]
-    out_df = df[df["Category"] == "Outerwear"]
+    acc_df = index["Accessory"]
+    bottom_df = index["Bottom"]
+    fb_df = index["Full Body"]
+    out_df = index["Outerwear"]
+    shoes_df = index["Shoes"]
+    top_df = index["Top"]
 
     return acc_df, bottom_df, fb_df, out_df, shoes_df, top_df
 
 
-def worn(closet):
+def counts(df, closet=None):
     """
-    Function to merge raw closet data and collected 2023 data.
+    Function to count number of times items have been worn in a dataframe.
 
-    Parameters
+    Parameters:
     ----------
-        closet : pandas.DataFrame
-            Dataframe containing complete closet log.
+        df : pandas.DataFrame
+            Dataframe of items to count frequency worn, obtained from fetch_data.
+        closet : pandas.DataFrame, optional
+            Dataframe obtained from closet_df. Loaded from CLOSET_PATH when
+            not given.
 
-    Returns
-    -------
+    Returns:
+    --------
         worn_df : pandas.DataFrame
-            Complete and standardized dataframe containing "ID", "Name", "count", "Item",
+            Dataframe containing "ID", "Name", "Count", "Item",
             "Category", "Sub-Category", "Color", "Pattern", "Brand", "Cost", "2023"
     """
-
-    sheet_url = "https://docs.google.com/spreadsheets/d/1TP7HQZxiP6as_HHexcwkmDTeXOQQOLbUesZjHwKA-Q4/edit?resourcekey#gid=1344494584"
-    url_1 = sheet_url.replace("/edit?resourcekey#gid=", "/export?format=csv&gid=")
-    form = pd.read_csv(url_1).drop("Timestamp", axis=1).melt("Date").dropna()
-
-    # extract ID number from value
-    form["ID"] = form.value.str.extract("(\d+)").astype(int)
-
-    form_counts = (
-        form.groupby(["value", "ID"])
+    df_counts = (
+        df.groupby(["value", "ID"])
         .count()
         .reset_index()
         .rename(columns={"Date": "count"})
@@ -134,7 +503,9 @@ def worn(closet):
     )
 
     # left join closet + df
-    worn_df = pd.merge(closet, form_counts, how="left", on="ID")
+    if closet is None:
+        closet = closet_df()
+    worn_df = pd.merge(closet, df_counts, how="left", on="ID")
     worn_df["Name"] = worn_df["Brand"] + " " + worn_df["Item"]
     worn_df = worn_df[
         [
@@ -159,13 +530,352 @@ def worn(closet):
     return worn_df
 
 
-def plot_mostworn(worn_df, item_name="Adidas Tennis Shoe"):
-    most_worn = worn_df.nlargest(10, columns="Count")
+def worn(closet=None):
+    """
+    Function to merge raw closet data and collected 2023 data.
+
+    Parameters
+    ----------
+        closet : pandas.DataFrame, optional
+            Dataframe containing complete closet log. Loaded from CLOSET_PATH
+            when not given.
+
+    Returns
+    -------
+        worn_df : pandas.DataFrame
+            Complete and standardized dataframe containing "ID", "Name", "count", "Item",
+            "Category", "Sub-Category", "Color", "Pattern", "Brand", "Cost", "2023"
+    """
+    df = fetch_data()
+    worn_df = counts(df, closet)
+
+    return worn_df
+
+
+def top_10_df(closet=None, df=None):
+    """
+    Function to return IDs and counts of top 10 most worn items.
+
+    Parameters:
+    -----------
+        closet : pandas.DataFrame, optional
+            Dataframe obtained from closet_df. Loaded when not given.
+        df : pandas.DataFrame, optional
+            Wear log obtained from fetch_data. Fetched when not given.
+
+    Returns:
+    --------
+        top_id : list
+            List containing the IDs of the top 10 most worn items.
+        top_item : list
+            List containing the item names of the top 10 most worn items.
+        df : pandas.DataFrame
+            Dataframe containing data only for top 10 most worn items.
+    """
+    data = WardrobeDataset(
+        closet if closet is not None else closet_df(),
+        df if df is not None else fetch_data(),
+    )
+
+    rows = data.heatmap_rows
+    return data.top_id, data.top_item, rows[rows["ID"].isin(data.top_id)]
+
+
+def heatmap_rows(closet, df):
+    """
+    Function to join every logged wear with the item that was worn.
+
+    Parameters:
+    -----------
+        closet : pandas.DataFrame
+            Dataframe obtained from closet_df.
+        df : pandas.DataFrame
+            Wear log obtained from fetch_data.
+
+    Returns:
+    --------
+        df : pandas.DataFrame
+            Dataframe containing "ID", "Item", "Color", "Pattern",
+            "Category", "Date", "Brand" per wear.
+    """
+    df = pd.merge(closet, df, how="right", on="ID")
+
+    return df[["ID", "Item", "Color", "Pattern", "Category", "Date", "Brand"]]
+
+
+def cpw_table(worn_df, df):
+    """
+    Function to calculate 2023 cost-per-wear for items with a known price.
+
+    Parameters:
+    -----------
+        worn_df : pandas.DataFrame
+            Standardized dataframe obtained from worn function.
+        df : pandas.DataFrame
+            Wear log obtained from fetch_data.
+
+    Returns:
+    --------
+        complete_df : pandas.DataFrame
+            Dataframe containing "ID", "Name", "Count", "Category",
+            "Sub-Category", "Pattern", "Cost", "2023", "Date", "Price", "CPW"
+            and "Cost Per Wear" per wear of a priced item.
+    """
+    complete_df = pd.merge(worn_df, df, how="inner", on="ID")
+    complete_df = complete_df[
+        [
+            "ID",
+            "Name",
+            "Count",
+            "Category",
+            "Sub-Category",
+            "Pattern",
+            "Cost",
+            "2023",
+            "Date",
+            "Price",
+        ]
+    ]
+    complete_df["CPW"] = (complete_df["Price"] / complete_df["Count"]).round(2)
+    complete_df["Cost Per Wear"] = "$" + complete_df["CPW"].astype(str)
+    complete_df["Cost Per Wear"] = [
+        i if i[-3] == "." else i + "0" for i in complete_df["Cost Per Wear"]
+    ]
+    complete_df = complete_df[complete_df["Price"] > 0]
+
+    return complete_df
+
+
+def season(day):
+    """
+    Function to assign season to day of year
+
+    Returns:
+    --------
+        s : str
+            Season that day of year in in.
+    """
+    # March 20 (79th day of year) = Spring Equinox
+    if day in range(79, 172):
+        s = "Spring"
+    # June 21 (172nd day of year) = Summer Solstice
+    elif day in range(172, 265):
+        s = "Summer"
+    # September 22 (265 day of year) = Fall Equinox
+    elif day in range(265, 355):
+        s = "Fall"
+    # December 21 (355th day of year) = Winter Solstice
+    # also need to include Jan 1 - March 19, 2023
+    else:
+        s = "Winter"
+
+    return s
+
+
+def split_seasons(df):
+    """
+    Function to return Google Sheet data parsed by season.
+
+    Parameters:
+    -----------
+        df : pandas.DataFrame
+            Wear log obtained from fetch_data.
+
+    Returns:
+        spring : pandas.DataFrame
+            Dataframe containing data from March 20, 2023 - June 20, 2023
+        summer : pandas.DataFrame
+            Dataframe containing data from June 21, 2023 - Sept 21, 2023
+        fall : pandas.DataFrame
+            Dataframe containing data from Sept 22, 2023 - Dec 20, 2023
+        winter : pandas.DataFrame
+            Dataframe containing data from January 1, 2023 - March 20, 2023
+            and December 21, 2023 to DEcember 31, 2023
+    """
+    df = df.assign(Day=df["Date"].dt.dayofyear)
+    df["Season"] = df["Day"].map(season)
+
+    spring = df.loc[df["Season"] == "Spring"]
+    summer = df.loc[df["Season"] == "Summer"]
+    fall = df.loc[df["Season"] == "Fall"]
+    winter = df.loc[df["Season"] == "Winter"]
+
+    return spring, summer, fall, winter
+
+
+def season_counts(df, closet):
+    """
+    Function to count how often every item was worn in each season.
+
+    Parameters:
+    -----------
+        df : pandas.DataFrame
+            Wear log obtained from fetch_data.
+        closet : pandas.DataFrame
+            Dataframe obtained from closet_df.
+
+    Returns:
+    --------
+        seasons : dict
+            Season name -> dataframe obtained from counts for that season.
+    """
+    spring, summer, fall, winter = split_seasons(df)
+
+    return {
+        "Spring": counts(spring, closet),
+        "Summer": counts(summer, closet),
+        "Fall": counts(fall, closet),
+        "Winter": counts(winter, closet),
+    }
+
+
+# most marks a chart is given; larger tables are summarised before plotting
+MAX_POINTS = 5000
+
+
+def count_by(df, fields):
+    """
+    Function to count rows per group, for charts that would otherwise
+    aggregate every row with count() in the browser.
+
+    Parameters:
+    -----------
+        df : pandas.DataFrame
+            Rows to count.
+        fields : list
+            Columns to group by.
+
+    Returns:
+    --------
+        counts : pandas.DataFrame
+            fields and "Count" per group, in order of first appearance.
+    """
+    return df.groupby(fields, sort=False).size().reset_index(name="Count")
+
+
+def boxplot_stats(df, group, value, extent=1.5):
+    """
+    Function to summarise a column the way Vega-Lite's boxplot mark does.
+
+    Parameters:
+    -----------
+        df : pandas.DataFrame
+            Rows to summarise.
+        group : str
+            Column with one box per value.
+        value : str
+            Column summarised.
+        extent : float
+            Whiskers reach the furthest values within extent times the
+            interquartile range of the box.
+
+    Returns:
+    --------
+        boxes : pandas.DataFrame
+            group, "Lower", "Q1", "Median", "Q3", "Upper", "Min" and "Max"
+            per box.
+        outliers : pandas.DataFrame
+            group and value of the rows beyond the whiskers.
+    """
+    df = df[[group, value]].dropna()
+    grouped = df.groupby(group, sort=False)[value]
+    boxes = pd.DataFrame(
+        {
+            "Q1": grouped.quantile(0.25),
+            "Median": grouped.median(),
+            "Q3": grouped.quantile(0.75),
+            "Min": grouped.min(),
+            "Max": grouped.max(),
+        }
+    )
+    iqr = boxes["Q3"] - boxes["Q1"]
+    low = df[group].map(boxes["Q1"] - extent * iqr)
+    high = df[group].map(boxes["Q3"] + extent * iqr)
+
+    inside = df[(df[value] >= low) & (df[value] <= high)].groupby(group)[value]
+    boxes["Lower"] = inside.min()
+    boxes["Upper"] = inside.max()
+    outliers = df[(df[value] < low) | (df[value] > high)]
+
+    boxes = boxes.reset_index()
+    return (
+        boxes[[group, "Lower", "Q1", "Median", "Q3", "Upper", "Min", "Max"]],
+        outliers,
+    )
+
+
+def bin_scatter(df, x, y, by, bins=40):
+    """
+    Function to summarise a scatter plot as one point per filled grid cell.
+
+    Parameters:
+    -----------
+        df : pandas.DataFrame
+            One row per point.
+        x, y : str
+            Columns plotted.
+        by : str
+            Column kept apart within a cell, e.g. the color field.
+        bins : int
+            Number of cells along each axis.
+
+    Returns:
+    --------
+        cells : pandas.DataFrame
+            by, mean x and y, and "Items" per cell.
+    """
+    cells = df.assign(
+        _x=pd.cut(df[x], bins, labels=False), _y=pd.cut(df[y], bins, labels=False)
+    )
+    cells = cells.groupby(["_x", "_y", by], observed=True).agg(
+        **{x: (x, "mean"), y: (y, "mean"), "Items": (x, "size")}
+    )
+    return cells.reset_index()[[by, x, y, "Items"]]
+
+
+def plot_mostworn(
+    worn_df,
+    item_name="Adidas Tennis Shoe",
+    i=10,
+    title="Ten Most Worn Pieces in 2023",
+    highlight="#a6e3d4",
+    signal=None,
+):
+    """
+    Function for the most worn items bar plot.
+
+    Parameters:
+    -----------
+        worn_df : pandas.DataFrame
+            Standardized dataframe obtained from worn function.
+        item_name : str
+            Name of the item to highlight.
+        i : int
+            Number of items to plot.
+        title : str
+            Plot title.
+        highlight : str
+            Color of the highlighted bar.
+        signal : str, optional
+            Name of a Vega signal holding the highlighted item, so the page
+            can change it without a new spec. item_name is then only its
+            initial value, listed in the spec's usermeta.
+
+    Returns:
+    --------
+        plot : altair.Chart
+            Bar chart of the i most worn items.
+    """
+    if signal:
+        selected = f"datum.Name === {signal}"
+    else:
+        selected = alt.datum.Name == item_name
+
+    most_worn = worn_df.nlargest(i, columns="Count")
     closet_comp = (
-        alt.Chart(most_worn, title="Ten Most Worn Pieces in 2023")
+        alt.Chart(most_worn, title=title)
         .mark_bar(
-            color="#d81159",
-            cornerRadiusBottomRight=10,
+            cornerRadiusTopLeft=10,
             cornerRadiusTopRight=10,
             opacity=0.85,
         )
@@ -174,18 +884,103 @@ def plot_mostworn(worn_df, item_name="Adidas Tennis Shoe"):
             alt.X("Count", title="Times Worn", axis=alt.Axis(tickMinStep=1)),
             alt.Tooltip("Count"),
             color=alt.condition(
-                alt.datum.Name == item_name,
-                alt.value("#218380"),  # highlights selected bar
-                alt.value("#e0ddd5"),
+                selected,
+                alt.value(highlight),  # highlighted bar
+                alt.value("#e0dfd7"),
             ),
+            opacity=alt.condition(selected, alt.value(0.85), alt.value(0.50)),
+        )
+        # .configure_title(color="#706f6c")
+        # .configure_axis(
+        #     labelColor="#706f6c", titleColor="#706f6c", grid=False, domain=False
+        # )
+    )
+    if signal:
+        closet_comp = closet_comp.properties(usermeta={"signals": {signal: item_name}})
+    return closet_comp
+
+
+def plot_top10(worn_df, item_name="Adidas Tennis Shoe"):
+    """
+    Function for the standalone top 10 most worn plot.
+
+    The highlighted bar is the "highlight" signal, which the dashboard sets
+    in the browser when another item is picked.
+
+    Parameters:
+    -----------
+        worn_df : pandas.DataFrame
+            Standardized dataframe obtained from worn function.
+        item_name : str
+            Name of the item highlighted initially.
+
+    Returns:
+    --------
+        plot : altair.Chart
+            Configured plot_mostworn bar chart.
+    """
+    plot = (
+        plot_mostworn(worn_df, item_name, signal="highlight")
+        .configure_title(color="#706f6c")
+        .configure_axis(
+            labelColor="#706f6c",
+            titleColor="#706f6c",
+            grid=False,
+            domain=False,
+        )
+        .configure_view(strokeWidth=0)
+    )
+    return plot
+
+
+def plot_leastworn(worn_df):
+
+    least_worn = worn_df[worn_df["Count"] > 0].nsmallest(15, columns="Count")
+
+    plot_leastworn = (
+        alt.Chart(least_worn, title="Ten Least Worn Pieces in 2023")
+        .mark_bar(
+            color="#a6e3d4",
+            cornerRadiusTopLeft=10,
+            cornerRadiusTopRight=10,
+            opacity=0.85,
+        )
+        .encode(
+            alt.Y("Name", title="", axis=alt.Axis(labelAngle=-0), sort="-x"),
+            alt.X("Count", title="Times Worn", axis=alt.Axis(tickMinStep=1)),
+            alt.Tooltip("Count"),
         )
         .configure_title(color="#706f6c")
         .configure_axis(
             labelColor="#706f6c", titleColor="#706f6c", grid=False, domain=False
         )
+        .configure_view(strokeWidth=0)
     )
+    return plot_leastworn
 
-    return closet_comp
+
+def plot_leastworn_cat(worn_df, index=None):
+
+    if index is None:
+        index = CategoryIndex(worn_df)
+    df = index.count(index.df["Count"] == 0)
+
+    base = (
+        alt.Chart(df, title="Category Breakdown of Least Worn Items")
+        .mark_arc(innerRadius=100, opacity=0.85)
+        .encode(
+            theta=alt.Theta("Count"),
+            color=alt.Color("Category", scale=alt.Scale(range=color_aes)),
+            tooltip=["Category", "Count"],
+        )
+        .configure_title(color="#706f6c")
+        .configure_axis(
+            labelColor="#706f6c", titleColor="#706f6c", grid=False, domain=False
+        )
+        .configure_view(strokeWidth=0)
+    )
+
+    return base
 
 
 def plot_color(worn_df):
@@ -216,8 +1011,10 @@ def plot_color(worn_df):
     # only keep multiple colors if present
     color_df = color_df[color_df["Color"] != "Delete"]
 
+    color_df = count_by(color_df, ["Color"])
+
     base = alt.Chart(color_df, title="Color Composition of 2023 Closet").encode(
-        theta=alt.Theta("count()", stack=True),
+        theta=alt.Theta("Count", stack=True),
         color=alt.Color(
             "Color",
             scale=alt.Scale(
@@ -245,7 +1042,8 @@ def plot_color(worn_df):
             ),
             legend=None,
         ),
-        tooltip=["Color", "count()"],
+        order=alt.Order(sort="ascending"),
+        tooltip=["Color", "Count"],
     )
 
     plot_color = (
@@ -270,116 +1068,123 @@ def plot_newitems(worn_df):
         plot : altair.Chart
             Pie chart of new items purchased in 2023.
     """
-    # change this to "Yes"
-    new_2023 = worn_df.loc[worn_df["2023"] == "No"]
+    new_2023 = worn_df.loc[worn_df["2023"] == "Yes"]
     new_2023["Bought"] = new_2023["Bought"].str.replace(
         "Secondhand, Thrifted", "Thrifted"
     )
     new_2023["Bought"] = new_2023["Bought"].str.replace("Secondhand, Depop", "Vintage")
     new_2023["Bought"] = new_2023["Bought"].str.replace("Secondhand, Gifted", "Gifted")
-    new_2023["Secondhand"] = [
-        "New" if i == "New" else "Secondhand" for i in new_2023["Bought"]
-    ]
+
+    new_2023 = count_by(new_2023, ["Bought"])
 
     base = (
         alt.Chart(new_2023, title="New Items Purchased in 2023")
-        .mark_arc()
+        .mark_arc(opacity=0.85)
         .encode(
-            theta=alt.Theta("count()", stack=True),
+            theta=alt.Theta("Count", stack=True),
             color=alt.Color(
                 "Bought",
-                scale=alt.Scale(
-                    range=[
-                        "#ffbc42",
-                        "#d81159",
-                        "#652d8f",
-                        "#25592a",
-                        "#218380",
-                        "#73d2de",
-                    ]
-                ),
-                legend=None,
+                scale=alt.Scale(range=color_aes),
+                # legend=alt.Legend(orient="left"),
             ),
-            tooltip=["Bought", "count()"],
+            tooltip=["Bought", "Count"],
         )
     )
 
-    cat = base.mark_arc(innerRadius=0, opacity=0.85)
-
-    txt = base.mark_text(angle=0, radius=180, size=15).encode(
-        alt.Color(
-            "Bought",
-            scale=alt.Scale(
-                range=[
-                    "#ffbc42",
-                    "#d81159",
-                    "#652d8f",
-                    "#25592a",
-                    "#218380",
-                    "#73d2de",
-                ]
-            ),
-            legend=None,
-        ),
-        text="Bought",
-    )
-    plot_bought = cat + txt
-    plot_bought = (
-        plot_bought.configure_title(color="#706f6c")
-        .configure_axis(
-            grid=False, domain=False, labelColor="#706f6c", titleColor="#706f6c"
-        )
-        .configure_view(strokeWidth=0)
-    )
-
+    plot_bought = base.mark_arc(innerRadius=100, opacity=0.85)
+
+    # plot_bought = (
+    #     cat.configure_title(color="#706f6c")
+    #     .configure_axis(
+    #         grid=False, domain=False, labelColor="#706f6c", titleColor="#706f6c"
+    #     )
+    #     .configure_view(strokeWidth=0)
+    # )
+
     return plot_bought
 
 
-def plot_categories(worn_df):
-    """
-    Function for categorial composition of closet.
+def plot_categories(worn_df, index=None):
 
-    Parameters:
-    -----------
-        worn_df : pandas.DataFrame
-            Standardized dataframe obtained from worn function.
-    Returns:
-    --------
-        plot : altair.Chart
-            Pie chart of clothing categories present in closet.
-    """
-    worn_df["Bought"] = worn_df["Bought"].str.replace(
-        "Secondhand, Thrifted", "Thrifted"
+    if index is None:
+        index = CategoryIndex(worn_df)
+    df = index.count(index.df["2023"] == "Yes")
+
+    plot = (
+        alt.Chart(df, title="Closet Categories")
+        .mark_bar(
+            cornerRadiusTopLeft=10,
+            cornerRadiusTopRight=10,
+            opacity=0.85,
+        )
+        .encode(
+            y=alt.Y("Category", sort="x", title=""),
+            x="Count",
+            color=alt.Color("Category", scale=alt.Scale(range=color_aes), legend=None),
+            tooltip=["Category", "Count"],
+        )
+        .configure_title(color="#706f6c")
+        .configure_axis(
+            labelColor="#706f6c", titleColor="#706f6c", grid=False, domain=False
+        )
+        .configure_view(strokeWidth=0)
     )
-    worn_df["Bought"] = worn_df["Bought"].str.replace("Secondhand, Depop", "Vintage")
-    worn_df["Bought"] = worn_df["Bought"].str.replace("Secondhand, Gifted", "Gifted")
+    return plot
+
 
-    base = alt.Chart(worn_df, title="Closet Categories").encode(
-        theta=alt.Theta("count()", stack=True),
-        color="Category",
-        tooltip=["Category", "count()"],
+def plot_new_concat(worn_df, index=None):
+    if index is None:
+        index = CategoryIndex(worn_df)
+    df1 = index.count(index.df["2023"] == "Yes")
+    df2 = worn_df[worn_df["2023"] == "Yes"]
+
+    barplot = (
+        alt.Chart(df1, title="Closet Categories")
+        .mark_bar(
+            cornerRadiusTopLeft=10,
+            cornerRadiusTopRight=10,
+            opacity=0.85,
+        )
+        .encode(
+            y=alt.Y("Category", sort="x", title=""),
+            x="Count",
+            color=alt.Color("Category", scale=alt.Scale(range=color_aes), legend=None),
+            tooltip=["Category", "Count"],
+        )
     )
 
-    cat = base.mark_arc(innerRadius=0, opacity=0.80)
-    txt = base.mark_text(radius=177, size=15).encode(
-        alt.Color(
-            "Category",
-            scale=alt.Scale(
-                range=["#ffbc42", "#d81159", "#652d8f", "#25592a", "#218380", "#73d2de"]
-            ),
-            legend=None,
+    # the boxplot mark is drawn from its summary instead of every price
+    boxes, outliers = boxplot_stats(df2, "Category", "Price")
+    y = alt.Y("Category")
+    color = alt.Color("Category", scale=alt.Scale(range=color_aes), legend=None)
+    price = dict(title="Price", axis=alt.Axis(format="$"))
+    box = alt.Chart(boxes, title="Price of New Items")
+
+    boxplot = alt.layer(
+        alt.Chart(outliers)
+        .mark_point()
+        .encode(x=alt.X("Price", **price), y=y, color=color),
+        box.mark_rule().encode(x=alt.X("Lower", **price), x2="Q1", y=y),
+        box.mark_rule().encode(x=alt.X("Q3", **price), x2="Upper", y=y),
+        box.mark_bar(size=14).encode(
+            x=alt.X("Q1", **price),
+            x2="Q3",
+            y=y,
+            color=color,
+            tooltip=["Category", "Max", "Q3", "Median", "Q1", "Min"],
         ),
-        text="Category",
+        box.mark_tick(color="white", size=14).encode(x=alt.X("Median", **price), y=y),
     )
 
-    plot_categories = cat + txt
-    plot_categories = (
-        plot_categories.configure_view(strokeWidth=0)
+    final_plot = (
+        alt.vconcat(barplot, boxplot)
         .configure_title(color="#706f6c")
-        .configure_axis(labelColor="#706f6c", titleColor="#706f6c")
+        .configure_axis(
+            labelColor="#706f6c", titleColor="#706f6c", grid=False, domain=False
+        )
+        .configure_view(strokeWidth=0)
     )
-
-    return plot_categories
+    return final_plot
 
 
 def plot_bought(worn_df):
@@ -395,6 +1200,7 @@ def plot_bought(worn_df):
         plot : altair.Chart
             Bar chart of secondhand vs new closet composition.
     """
+    worn_df = worn_df.copy()
     worn_df["Bought"] = worn_df["Bought"].str.replace(
         "Secondhand, Thrifted", "Thrifted"
     )
@@ -404,37 +1210,31 @@ def plot_bought(worn_df):
         "New" if i == "New" else "Secondhand" for i in worn_df["Bought"]
     ]
 
+    worn_df = count_by(worn_df, ["Secondhand", "Bought"])
+
     plot = (
         alt.Chart(worn_df, title="New vs Secondhand Items")
         .mark_bar(cornerRadiusBottomRight=10, cornerRadiusTopRight=10, opacity=0.80)
         .encode(
-            alt.X("count()", title="Count"),
+            alt.X("Count", title="Count"),
             alt.Y("Secondhand", sort="-x"),
             alt.Color(
                 "Bought",
-                scale=alt.Scale(
-                    range=[
-                        "#ffbc42",
-                        "#d81159",
-                        "#652d8f",
-                        "#25592a",
-                        "#218380",
-                        "#73d2de",
-                    ]
-                ),
+                scale=alt.Scale(range=color_aes),
             ),
-            tooltip="count()",
+            tooltip="Count",
         )
         .configure_title(color="#706f6c")
         .configure_axis(
             grid=False, domain=False, labelColor="#706f6c", titleColor="#706f6c"
         )
         .properties(height=200)
+        .configure_view(strokeWidth=0)
     )
     return plot
 
 
-def plot_facet(worn_df):
+def plot_facet(worn_df, index=None):
     """
     Function to plot top 5 most worn items per clothing category.
 
@@ -442,6 +1242,8 @@ def plot_facet(worn_df):
     ----------
         worn_df : pandas.DataFrame
             Standardized dataframe obtained from worn function.
+        index : CategoryIndex, optional
+            Category index of worn_df. Built from worn_df when not given.
 
     Returns:
     --------
@@ -450,13 +1252,13 @@ def plot_facet(worn_df):
             and Shoe categories.
     """
     categories = ["Top", "Bottom", "Full Body", "Outerwear", "Accessory", "Shoes"]
+    if index is None:
+        index = CategoryIndex(worn_df)
 
     cat_plots = []
 
     for i in categories:
-        category_worn = worn_df.loc[worn_df["Category"] == i].nlargest(
-            5, columns="Count"
-        )
+        category_worn = index[i].nlargest(5, columns="Count")
 
         category_plot = (
             alt.Chart(category_worn, title=f"2023 Most Worn {i}")
@@ -486,50 +1288,6 @@ def plot_facet(worn_df):
     return category_plot
 
 
-def top_10_df():
-    """
-    Function to return IDs and counts of top 10 most worn items.
-
-    Parameters:
-    -----------
-        None
-
-    Returns:
-    --------
-        top_id : list
-            List containing the IDs of the top 10 most worn items.
-        top_item : list
-            List containing the item names of the top 10 most worn items.
-        df : pandas.DataFrame
-            Dataframe containing data only for top 10 most worn items.
-    """
-    sheet_url = "https://docs.google.com/spreadsheets/d/1TP7HQZxiP6as_HHexcwkmDTeXOQQOLbUesZjHwKA-Q4/edit?resourcekey#gid=1344494584"
-    url_1 = sheet_url.replace("/edit?resourcekey#gid=", "/export?format=csv&gid=")
-    df = pd.read_csv(url_1).drop("Timestamp", axis=1).melt("Date").dropna()
-
-    df["Date"] = pd.to_datetime(df["Date"])
-    df["ID"] = df.value.str.extract("(\d+)").astype(int)
-
-    # column of day of week for one calender year
-    time_df = pd.DataFrame()
-    time_df["Date"] = pd.date_range(df["Date"].min(), periods=365)
-    time_df["Day"] = time_df["Date"].dt.day_name()
-
-    # data wrangling to select top 10 most worn items
-    closet = closet_df()
-    worn_df = worn(closet)
-    most_worn = worn_df.nlargest(10, columns="Count")
-
-    # merge dataframes
-    df = pd.merge(closet, df, how="right", on="ID")
-    top_id = most_worn["ID"].to_list()
-    top_item = (most_worn["Brand"] + " " + most_worn["Item"]).to_list()
-
-    df = df[["ID", "Item", "Color", "Pattern", "Category", "Date", "Brand"]]
-
-    return top_id, top_item, df
-
-
 def plot_heatmap(top_10, df, z=0):
     """
     Function for heatmap plot. This is some knarly code I apologize.
@@ -552,28 +1310,14 @@ def plot_heatmap(top_10, df, z=0):
 
     """
 
-    # column of day of week for one calender year
-    time_df = pd.DataFrame()
-    time_df["Date"] = pd.date_range(df["Date"].min(), periods=365)
-    time_df["Day"] = time_df["Date"].dt.day_name()
-
     heatmap_data = df.loc[df["ID"] == top_10[z]]  # need to make this dynamic in plot
     item_name = heatmap_data["Brand"].iloc[0] + " " + heatmap_data["Item"].iloc[0]
 
-    # isolate item data
-    year = pd.merge(time_df, heatmap_data, how="outer", on="Date")
-    year["Item"] = year["Item"].replace(np.nan, 0)
-    year["Bool"] = np.where(year["Item"] == 0, 0, 1)
-
-    # this is horrible to read lol
-    # wrangling for prettier plotting
-    week = time_df["Date"].dt.isocalendar()
-    year["Week"] = week["week"].fillna(52)
-    year["Week"] = year["Week"].fillna(52)
-    year["First_day"] = year["Date"].dt.to_period("W-SAT").dt.start_time
-    week = time_df["Date"].dt.strftime("%m-%d-%y")
-    year["Week"] = year["First_day"].dt.strftime("%m-%d")
-    year = year[["Date", "Day", "Item", "ID", "Bool", "Week"]]
+    # the chart only gets the first day and the days the item was worn on;
+    # the browser lays out the calender year from them
+    start = df["Date"].min().normalize()
+    days = (heatmap_data["Date"] - start).dt.days
+    worn = sorted({int(d) for d in days if 0 <= d < 365})
 
     weekdays = [
         "Sunday",
@@ -582,15 +1326,24 @@ def plot_heatmap(top_10, df, z=0):
         "Wednesday",
         "Thursday",
         "Friday",
-        "Sunday",
+        "Saturday",
     ]
 
     heat_plot = (
-        alt.Chart(year, title=f"{item_name} in 2023")
+        alt.Chart(alt.sequence(0, 365, as_="d"), title=f"{item_name} in 2023")
+        .transform_calculate(
+            Date=f"datetime({start.year}, {start.month - 1}, {start.day} + datum.d)"
+        )
+        .transform_calculate(
+            Day="timeFormat(datum.Date, '%A')",
+            # weeks start on Sunday and are labelled by their first day
+            Week="timeFormat(datetime(year(datum.Date), month(datum.Date), "
+            "date(datum.Date) - day(datum.Date)), '%m-%d')",
+            Bool=f"indexof({worn}, datum.d) >= 0 ? 1 : 0",
+        )
         .mark_rect(
             stroke="white",
             strokeWidth=3,
-            opacity=0.80,
         )
         .encode(
             alt.X(
@@ -599,13 +1352,16 @@ def plot_heatmap(top_10, df, z=0):
                     labelAngle=-60,
                 ),
             ),
-            alt.Y("Day", sort=weekdays, title=""),
+            alt.Y("Day:N", sort=weekdays, title=""),
             alt.Color(
-                "Bool",
-                scale=alt.Scale(domain=[0, 1], range=["#e0ddd5", "#218380"]),
+                "Bool:Q",
+                scale=alt.Scale(domain=[0, 1], range=["#e0dfd7", "#a6e3d4"]),
                 legend=None,
             ),
-            alt.Tooltip(["Date", "Day"]),
+            alt.Tooltip(["Date:T", "Day:N"]),
+            opacity=alt.condition(
+                alt.datum.Bool == 1, alt.value(0.85), alt.value(0.50)
+            ),
         )
         .properties(height=200, width=600)
         .configure_axis(
@@ -617,71 +1373,665 @@ def plot_heatmap(top_10, df, z=0):
     return heat_plot
 
 
-def plot_cpw(worn_df):
+def plot_cpw(complete_df):
     """
     Function for 2023 cost-per-wear plot.
 
     Parameters:
     -----------
-        None
+        complete_df : pandas.DataFrame
+            Cost-per-wear table obtained from cpw_table.
 
     Returns:
     --------
         plot : altair.Chart
             Scatter plot of item counts over price.
     """
-
-    # read in Google sheet idea
-    sheet_url = "https://docs.google.com/spreadsheets/d/1TP7HQZxiP6as_HHexcwkmDTeXOQQOLbUesZjHwKA-Q4/edit?resourcekey#gid=1344494584"
-    url_1 = sheet_url.replace("/edit?resourcekey#gid=", "/export?format=csv&gid=")
-    df = pd.read_csv(url_1).drop("Timestamp", axis=1).melt("Date").dropna()
-
-    df["Date"] = pd.to_datetime(df["Date"])
-    df["ID"] = df.value.str.extract("(\d+)").astype(int)
-
-    # calculate 2023 cost-per-wear
-    complete_df = pd.merge(worn_df, df, how="inner", on="ID")
-    complete_df = complete_df[
-        [
-            "ID",
-            "Name",
-            "Count",
-            "Category",
-            "Sub-Category",
-            "Pattern",
-            "Cost",
-            "2023",
-            "Date",
-            "Price",
-        ]
-    ]
-    complete_df["CPW"] = (complete_df["Price"] / complete_df["Count"]).round(1)
-    complete_df["Cost Per Wear"] = "$" + complete_df["CPW"].astype(str) + "0"
+    # one point per item rather than per wear, or per grid cell for large closets
+    points = complete_df.drop_duplicates("ID")
+    size = alt.value(80)
+    tooltip = ["Name", "Category", "Cost Per Wear", "Count"]
+    if len(points) > MAX_POINTS:
+        points = bin_scatter(points, "Price", "Count", "Category")
+        size = alt.Size("Items", legend=None)
+        tooltip = ["Category", "Items"]
 
     plot = (
-        alt.Chart(complete_df, title="2023 Cost Per Wear (CPW)")
-        .mark_circle(opacity=0.70)
+        alt.Chart(points, title="2023 Cost Per Wear (CPW)")
+        .mark_circle(opacity=0.70, size=80)
         .encode(
-            alt.X("Price", scale=alt.Scale(domain=(0, 200))),
-            alt.Y("Count", scale=alt.Scale(domain=(0, 60)), title="Times Worn"),
+            alt.X(
+                "Price", axis=alt.Axis(format="$,.2f"), scale=alt.Scale(domain=(0, 185))
+            ),
+            alt.Y("Count", scale=alt.Scale(domain=(0, 50)), title="Times Worn"),
             alt.Color(
                 "Category",
-                scale=alt.Scale(
-                    range=[
-                        "#ffbc42",
-                        "#d81159",
-                        "#652d8f",
-                        "#25592a",
-                        "#218380",
-                        "#73d2de",
-                    ]
-                ),
+                scale=alt.Scale(range=color_aes),
             ),
-            alt.Size("CPW", scale=alt.Scale(domain=[0, 35]), legend=None),
-            alt.Tooltip(["Name", "Category", "Cost Per Wear"]),
+            alt.Tooltip(tooltip),
+            size=size,
         )
         .configure_axis(grid=False, labelColor="#706f6c", titleColor="#706f6c")
         .configure_title(color="#706f6c")
+        .configure_view(strokeWidth=0)
+        .interactive()
+    )
+
+    return plot
+
+
+def plot_seasons(seasons):
+    """
+    Function to plot the five most worn items of every season.
+
+    Parameters:
+    -----------
+        seasons : dict
+            Season name -> counts dataframe, obtained from season_counts.
+
+    Returns:
+    --------
+        plot : altair.Chart
+            Four concatenated most-worn bar charts, one per season.
+    """
+    season_list = ["Spring", "Summer", "Fall", "Winter"]
+    color = ["#b6f0e2", "#73de83", "#ffbc42", "#73d2de"]
+    plot_list = []
+
+    for i in range(0, 4):
+        x = plot_mostworn(
+            seasons[season_list[i]],
+            title=f"{season_list[i]}: Most Worn Pieces",
+            i=5,
+            highlight=color[i],
+        )  # change winter to i once spring starts
+        x = x.properties(height=100, width=200)
+        plot_list.append(x)
+
+    row1 = alt.vconcat(plot_list[3], plot_list[1])
+    row2 = alt.vconcat(plot_list[2], plot_list[0])
+    final = (
+        alt.hconcat(row1, row2)
+        .configure_title(color="#706f6c")
+        .configure_axis(
+            labelColor="#706f6c", titleColor="#706f6c", grid=False, domain=False
+        )
+        .configure_view(strokeWidth=0)
+    )
+    return final
+
+
+def plot_clusters(items, profile):
+    """
+    Function for wear-pattern cluster summary plot.
+
+    Parameters:
+    -----------
+        items : pandas.DataFrame
+            Dataframe of cluster per item, obtained from wear_clusters.
+        profile : pandas.DataFrame
+            Dataframe of average weekly wears per cluster, obtained from
+            wear_clusters.
+
+    Returns:
+    --------
+        plot : altair.Chart
+            Bar chart of items per cluster next to each cluster's weekly
+            wear profile.
+    """
+    cluster_colors = alt.Scale(
+        domain=["Year-round", "Spring", "Summer", "Fall", "Winter", "Dormant"],
+        range=["#827191", "#b6f0e2", "#73de83", "#ffbc42", "#73d2de", "#e0dfd7"],
+    )
+
+    sizes = items["Cluster"].value_counts().rename_axis("Cluster")
+    sizes = sizes.reset_index(name="Items")
+
+    bars = (
+        alt.Chart(sizes, title="Wear Patterns")
+        .mark_bar(cornerRadiusTopRight=10, cornerRadiusBottomRight=10, opacity=0.85)
+        .encode(
+            alt.Y("Cluster", sort="-x", title=""),
+            alt.X("Items", title="Items", axis=alt.Axis(tickMinStep=1)),
+            alt.Color("Cluster", scale=cluster_colors, legend=None),
+            tooltip=["Cluster", "Items"],
+        )
+        .properties(height=200, width=200)
+    )
+
+    lines = (
+        alt.Chart(
+            profile[profile["Cluster"] != "Dormant"], title="Average Weekly Wears"
+        )
+        .mark_line(interpolate="monotone", opacity=0.85)
+        .encode(
+            alt.X("Week:Q", scale=alt.Scale(domain=(1, 53))),
+            alt.Y("Wears", title="Wears per Item"),
+            alt.Color("Cluster", scale=cluster_colors, legend=None),
+            tooltip=["Cluster", "Week", "Items"],
+        )
+        .properties(height=200, width=350)
     )
 
+    plot = (
+        alt.hconcat(bars, lines)
+        .configure_title(color="#706f6c")
+        .configure_axis(
+            labelColor="#706f6c", titleColor="#706f6c", grid=False, domain=False
+        )
+        .configure_view(strokeWidth=0)
+    )
     return plot
+
+
+# weeks of the year (day 365/366 spills into a 53rd bucket)
+WEEKS = 53
+
+# smoothing kernel so neighbouring weeks count towards the same season
+_WEEK_KERNEL = np.array([1, 2, 3, 2, 1]) / 9
+
+# previous clustering run, reused when the wear log only grew; replaced
+# whole, never updated in place, so concurrent callers see one run or the other
+_cluster_cache = {}
+
+
+def weekly_wear(df, ids):
+    """
+    Function to build a weekly wear histogram for every item.
+
+    Logs spanning several years are folded onto a single calendar year.
+
+    Parameters:
+    -----------
+        df : pandas.DataFrame
+            Wear log containing one row per item worn, with "Date" and "ID".
+        ids : numpy.ndarray
+            Sorted array of item IDs, one histogram row per ID.
+
+    Returns:
+    --------
+        hist : numpy.ndarray
+            Array of shape (len(ids), 53) with the number of wears per week.
+    """
+    df = df[df["ID"].isin(ids)]
+    rows = np.searchsorted(ids, df["ID"].to_numpy())
+    weeks = (pd.to_datetime(df["Date"]).dt.dayofyear.to_numpy() - 1) // 7
+
+    hist = np.zeros((len(ids), WEEKS))
+    np.add.at(hist, (rows, weeks), 1)
+
+    return hist
+
+
+def kmeans(X, k, n_iter=100, seed=0):
+    """
+    Function for plain NumPy k-means clustering.
+
+    Parameters:
+    -----------
+        X : numpy.ndarray
+            Array of shape (n_points, n_features) to cluster.
+        k : int
+            Number of clusters.
+        n_iter : int
+            Maximum number of Lloyd iterations.
+        seed : int
+            Seed for the k-means++ initialisation.
+
+    Returns:
+    --------
+        labels : numpy.ndarray
+            Cluster index of every point.
+        centroids : numpy.ndarray
+            Array of shape (k, n_features) of cluster centres.
+    """
+    k = min(k, len(X))
+    # k-means++: spread the initial centroids out
+    rng = np.random.default_rng(seed)
+    centroids = [X[rng.integers(len(X))]]
+    for _ in range(1, k):
+        dist = ((X[:, None, :] - np.array(centroids)[None]) ** 2).sum(-1).min(1)
+        p = dist / dist.sum() if dist.sum() > 0 else None
+        centroids.append(X[rng.choice(len(X), p=p)])
+    centroids = np.array(centroids)
+
+    for _ in range(n_iter):
+        labels = ((X[:, None, :] - centroids[None]) ** 2).sum(-1).argmin(1)
+        updated = np.array(
+            [
+                X[labels == j].mean(0) if (labels == j).any() else centroids[j]
+                for j in range(k)
+            ]
+        )
+        if np.allclose(updated, centroids):
+            break
+        centroids = updated
+
+    return labels, centroids
+
+
+def label_cluster(profile, threshold=2.0):
+    """
+    Function to name a cluster after the season its wear concentrates in.
+
+    Parameters:
+    -----------
+        profile : numpy.ndarray
+            Weekly wear profile (centroid) of the cluster.
+        threshold : float
+            How many times its fair share of wear a season needs before the
+            cluster counts as seasonal rather than year-round.
+
+    Returns:
+    --------
+        name : str
+            "Year-round", "Spring", "Summer", "Fall" or "Winter".
+    """
+    week_season = np.array([season(w * 7 + 4) for w in range(WEEKS)])
+
+    concentration = {}
+    for s in ["Spring", "Summer", "Fall", "Winter"]:
+        in_season = week_season == s
+        share = profile[in_season].sum() / max(profile.sum(), 1e-9)
+        concentration[s] = share / in_season.mean()
+
+    name = max(concentration, key=concentration.get)
+    if concentration[name] < threshold:
+        name = "Year-round"
+
+    return name
+
+
+def wear_clusters(df, ids, version=None, k=4, min_wears=3):
+    """
+    Function to group items by the shape of their weekly wear histogram.
+
+    Items worn fewer than `min_wears` times are "Dormant". The rest are
+    clustered with k-means on their smoothed, normalised weekly histogram
+    and each cluster is named after its dominant season (or "Year-round").
+    Results are cached per data version; when the wear log has only grown
+    since the last run, only the new rows are added to the histogram. k-means
+    always starts from the same seed, so the clusters only depend on the log.
+
+    Parameters:
+    -----------
+        df : pandas.DataFrame
+            Wear log obtained from fetch_data.
+        ids : list
+            IDs of every item in the closet.
+        version : str, optional
+            Data version of the wear log. Hashed from the log when not given.
+        k : int
+            Number of k-means clusters.
+        min_wears : int
+            Items worn fewer times than this are labelled "Dormant".
+
+    Returns:
+    --------
+        items : pandas.DataFrame
+            Dataframe containing "ID", "Wears" and "Cluster" per item.
+        profile : pandas.DataFrame
+            Dataframe containing "Cluster", "Week", "Wears" (average wears per
+            item in that week) and "Items" (number of items in the cluster).
+    """
+    # date order, so a log that only grew extends the previous one
+    df = df[["Date", "ID"]].sort_values(["Date", "ID"], kind="mergesort")
+    global _cluster_cache
+    ids = np.sort(np.unique(np.asarray(ids)))
+    cached = _cluster_cache
+    row_hashes = None
+    if version is None:
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+        version = row_hashes.sum()
+    if cached.get("version") == version:
+        return cached["result"]
+
+    # the log is hashed once, and its prefix checked from the same row hashes
+    if row_hashes is None:
+        row_hashes = pd.util.hash_pandas_object(df, index=False).to_numpy()
+    n = cached.get("n_rows", 0)
+    grown = (
+        np.array_equal(cached.get("ids"), ids)
+        and 0 < n <= len(df)
+        and row_hashes[:n].sum() == cached["prefix"]
+    )
+    if grown:
+        hist = cached["hist"] + weekly_wear(df.iloc[n:], ids)
+    else:
+        hist = weekly_wear(df, ids)
+
+    wears = hist.sum(1)
+    active = wears >= min_wears
+    names = np.full(len(ids), "Dormant", dtype=object)
+
+    if active.any():
+        # circular smoothing, then normalise so clusters compare shapes
+        padded = np.concatenate([hist[:, -2:], hist, hist[:, :2]], axis=1)
+        smooth = np.apply_along_axis(np.convolve, 1, padded, _WEEK_KERNEL, "valid")
+        X = smooth[active] / smooth[active].sum(1, keepdims=True)
+
+        labels, centroids = kmeans(X, k)
+        cluster_names = [label_cluster(c) for c in centroids]
+        names[active] = [cluster_names[j] for j in labels]
+
+    items = pd.DataFrame({"ID": ids, "Wears": wears.astype(int), "Cluster": names})
+
+    profile = pd.DataFrame(hist, columns=range(1, WEEKS + 1))
+    profile["Cluster"] = names
+    profile = profile.groupby("Cluster").mean().reset_index()
+    profile = profile.melt("Cluster", var_name="Week", value_name="Wears")
+    profile = profile.merge(
+        items["Cluster"].value_counts().rename("Items"),
+        left_on="Cluster",
+        right_index=True,
+    )
+
+    _cluster_cache = dict(
+        version=version,
+        result=(items, profile),
+        ids=ids,
+        n_rows=len(df),
+        prefix=row_hashes.sum(),
+        hist=hist,
+    )
+
+    return items, profile
+
+
+def closet_aggregates(worn_df, df):
+    """
+    Function to precompute the closet aggregates the what-if simulator
+    works from.
+
+    Parameters:
+    -----------
+        worn_df : pandas.DataFrame
+            Standardized dataframe obtained from worn function.
+        df : pandas.DataFrame
+            Wear log obtained from fetch_data, used for the number of weeks
+            logged so far.
+
+    Returns:
+    --------
+        aggs : dict
+            Per-item arrays ("ID", "Price", "Count", "Priced", "New",
+            "Category" codes), the category names and the closet totals.
+    """
+    ids = worn_df["ID"].to_numpy()
+    order = np.argsort(ids)
+    price = worn_df["Price"].to_numpy(dtype=float)[order]
+    count = worn_df["Count"].to_numpy(dtype=float)[order]
+    new = (worn_df["2023"] == "Yes").to_numpy()[order]
+    codes, categories = pd.factorize(worn_df["Category"].to_numpy()[order])
+    priced = price > 0
+
+    dates = pd.to_datetime(df["Date"])
+    weeks = max((dates.max() - dates.min()).days + 1, 1) / 7
+
+    return {
+        "ID": ids[order],
+        "Price": price,
+        "Count": count,
+        "Priced": priced,
+        "New": new,
+        "Category": codes,
+        "categories": list(categories),
+        "weeks": weeks,
+        "items": len(ids),
+        "n_priced": priced.sum(),
+        "price_sum": price[priced].sum(),
+        "count_sum": count[priced].sum(),
+        "spent": price[new].sum(),
+        "category_counts": np.bincount(codes, minlength=len(categories)),
+    }
+
+
+def simulate(aggs, add=None, remove=None):
+    """
+    Function to evaluate a what-if scenario against the closet aggregates.
+
+    Only the added and removed items are touched, so a scenario costs
+    O(len(add) + len(remove)) no matter how big the closet or the log is.
+
+    Parameters:
+    -----------
+        aggs : dict
+            Aggregates obtained from closet_aggregates.
+        add : list of dict, optional
+            Hypothetical purchases, each with "Price", "Rate" (expected wears
+            per week) and "Category".
+        remove : list, optional
+            IDs of items to purge from the closet.
+
+    Returns:
+    --------
+        stats : dict
+            Number of items, average price, average times worn, average
+            cost-per-wear, 2023 spend and items per category.
+    """
+    add = add or []
+    remove = np.unique(np.asarray(remove if remove is not None else [], dtype=int))
+
+    price = np.array([i["Price"] for i in add], dtype=float)
+    wears = np.array([i["Rate"] for i in add], dtype=float) * aggs["weeks"]
+    priced = price > 0
+
+    # items to purge, ignoring IDs that are not in the closet (or the closet
+    # is empty)
+    pos = np.searchsorted(aggs["ID"], remove)
+    found = pos < len(aggs["ID"])
+    pos, remove = pos[found], remove[found]
+    pos = pos[aggs["ID"][pos] == remove]
+    out_priced = pos[aggs["Priced"][pos]]
+
+    n_priced = aggs["n_priced"] + priced.sum() - len(out_priced)
+    price_sum = (
+        aggs["price_sum"] + price[priced].sum() - aggs["Price"][out_priced].sum()
+    )
+    count_sum = (
+        aggs["count_sum"] + wears[priced].sum() - aggs["Count"][out_priced].sum()
+    )
+
+    # category balance, new categories go on the end
+    categories = list(aggs["categories"])
+    for i in add:
+        if i["Category"] not in categories:
+            categories.append(i["Category"])
+    add_codes = np.array([categories.index(i["Category"]) for i in add], dtype=int)
+    category_counts = (
+        np.pad(aggs["category_counts"], (0, len(categories) - len(aggs["categories"])))
+        + np.bincount(add_codes, minlength=len(categories))
+        - np.bincount(aggs["Category"][pos], minlength=len(categories))
+    )
+
+    avg_price = price_sum / n_priced if n_priced else 0.0
+    avg_worn = count_sum / n_priced if n_priced else 0.0
+
+    return {
+        "items": aggs["items"] + len(add) - len(pos),
+        "avg_price": avg_price,
+        "avg_worn": avg_worn,
+        "avg_cpw": avg_price / avg_worn if avg_worn else 0.0,
+        "spent": aggs["spent"] + price.sum(),
+        "categories": dict(zip(categories, category_counts.tolist())),
+    }
+
+
+class WardrobeDataset:
+    """
+    A closet + wear log snapshot with its derived views.
+
+    Every view is computed the first time it is used and cached on the
+    instance. A dataset never changes after it is built, so each view is
+    computed at most once per data version; load a new dataset when the
+    closet or the log changes.
+
+    Parameters:
+    -----------
+        closet : pandas.DataFrame
+            Dataframe obtained from closet_df.
+        log : pandas.DataFrame
+            Wear log obtained from fetch_data.
+        rentals : pandas.DataFrame, optional
+            Rentals obtained from rentals_df.
+
+    Attributes:
+    -----------
+        version : str
+            Snapshot version obtained from snapshot_version.
+        load_times : dict
+            Source name -> seconds it took to load, when built by load.
+    """
+
+    def __init__(self, closet, log, rentals=None):
+        self.closet = closet
+        self.log = log
+        self.rentals = rentals
+        self.version = snapshot_version(closet, log, rentals)
+        self.load_times = {}
+        self._top = {}
+
+    @classmethod
+    def load(cls, path=CLOSET_PATH, url=SHEET_URL, rentals=RENTALS_PATH, executor=None):
+        """
+        Function to load the closet CSV, fetch the wear log and read the
+        rentals, all at the same time.
+
+        Parameters:
+        -----------
+            path : str
+                Path to CSV file containing closet information.
+            url : str
+                CSV export of the outfit log.
+            rentals : str, optional
+                Path to the Excel file of rented items, None to leave them out.
+            executor : concurrent.futures.Executor, optional
+                Pool the sources are loaded in, e.g. a ProcessPoolExecutor
+                to parse them in parallel. A thread per source when not given.
+
+        Returns:
+        --------
+            data : WardrobeDataset
+                Dataset for the current snapshot.
+        """
+        sources = {"closet": (closet_df, path), "log": (fetch_data, url)}
+        if rentals is not None:
+            sources["rentals"] = (rentals_df, rentals)
+
+        # the sources are independent, so the slowest one sets the load time
+        pool = executor or ThreadPoolExecutor(
+            max_workers=len(sources), thread_name_prefix="load"
+        )
+        with nullcontext(pool) if executor else pool:
+            futures = {
+                name: pool.submit(timed, *source) for name, source in sources.items()
+            }
+            loaded = {name: future.result() for name, future in futures.items()}
+
+        data = cls(
+            loaded["closet"][0],
+            loaded["log"][0],
+            loaded["rentals"][0] if rentals is not None else None,
+        )
+        data.load_times = {name: seconds for name, (_, seconds) in loaded.items()}
+        return data
+
+    @cached_property
+    def counts(self):
+        """Times worn per item, obtained from counts."""
+        return counts(self.log, self.closet)
+
+    @cached_property
+    def categories(self):
+        """CategoryIndex over the counts."""
+        return CategoryIndex(self.counts)
+
+    @cached_property
+    def cpw(self):
+        """Cost-per-wear table, obtained from cpw_table."""
+        return cpw_table(self.counts, self.log)
+
+    @cached_property
+    def season_counts(self):
+        """Season name -> times worn per item that season."""
+        return season_counts(self.log, self.closet)
+
+    @cached_property
+    def heatmap_rows(self):
+        """Every logged wear joined with the item, for plot_heatmap."""
+        return heatmap_rows(self.closet, self.log)
+
+    @cached_property
+    def clusters(self):
+        """Wear-pattern clusters, obtained from wear_clusters."""
+        return wear_clusters(self.log, self.closet["ID"], version=self.version)
+
+    @cached_property
+    def rental_stats(self):
+        """Rental numbers, obtained from rental_stats, or None without rentals."""
+        if self.rentals is None:
+            return None
+        return rental_stats(self.rentals)
+
+    @cached_property
+    def aggregates(self):
+        """What-if simulator aggregates, obtained from closet_aggregates."""
+        return closet_aggregates(self.counts, self.log)
+
+    def top(self, n=10):
+        """
+        Function to return the n most worn items.
+
+        Parameters:
+        -----------
+            n : int
+                Number of items.
+
+        Returns:
+        --------
+            most_worn : pandas.DataFrame
+                Rows of counts for the n most worn items.
+        """
+        if n not in self._top:
+            self._top[n] = self.counts.nlargest(n, columns="Count")
+        return self._top[n]
+
+    @cached_property
+    def top_id(self):
+        """IDs of the 10 most worn items."""
+        return self.top(10)["ID"].to_list()
+
+    @cached_property
+    def top_item(self):
+        """Names of the 10 most worn items."""
+        most_worn = self.top(10)
+        return (most_worn["Brand"] + " " + most_worn["Item"]).to_list()
+
+    @cached_property
+    def stats(self):
+        """Closet numbers quoted in the dashboard text."""
+        worn_df = self.counts
+
+        # closet analysis
+        cost_df = worn_df[worn_df["Price"] > 0]
+        avg_price = round(cost_df["Price"].mean(), 2)
+        avg_worn = round(cost_df["Count"].mean(), 1)
+
+        # bought in 2023
+        df_2023 = worn_df.loc[worn_df["2023"] == "Yes"]
+
+        return {
+            "items": len(worn_df),
+            "avg_price": avg_price,
+            "avg_worn": avg_worn,
+            "avg_cpw": round(avg_price / avg_worn, 2),
+            "n_leastworn": len(worn_df[worn_df["Count"] == 0]),
+            "n_2023": len(df_2023),
+            "annual_spent": df_2023["Price"].sum(),
+            "new_percent_thrifted": (
+                df_2023["Bought"].str.count("Secondhand").sum() / len(df_2023) * 100
+            ),
+            "all_percent_thrifted": (
+                worn_df["Bought"].str.count("Secondhand").sum() / len(worn_df) * 100
+            ),
+        }
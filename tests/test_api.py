@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+
+"""Tests for the JSON API of `api`."""
+
+import pandas as pd
+import pytest
+from flask import Flask
+
+from src.api import WardrobeAPI
+from src.provider import DataProvider
+
+
+class Dataset:
+    """Dataset with only what the rentals table and summary are drawn from."""
+
+    version = "v1"
+    stats = {"items": 3}
+    rental_stats = None
+    load_times = {}
+    rentals = pd.DataFrame(
+        {
+            "Item": ["Dress", "Coat", "Skirt", "Top", "Jumpsuit"],
+            "Category": ["Dress", "Outerwear", "Bottom", "Top", "Dress"],
+            "Days": [3, 5, None, 1, 2],
+            "Bought": [False, True, False, False, False],
+        }
+    )
+
+
+def serve(build="b1"):
+    """Function to return a test client of the API of a Dataset."""
+    server = Flask(__name__)
+    api = WardrobeAPI(DataProvider(Dataset), per_page=2, max_per_page=3, build=build)
+    api.register(server)
+    return server.test_client()
+
+
+@pytest.fixture
+def client():
+    """Test client of a server with the API of a Dataset."""
+    return serve()
+
+
+def test_index(client):
+    body = client.get("/api/v1/").get_json()
+    assert "rentals" in body["tables"]
+    assert "summary" in body["summaries"]
+
+
+def test_pages(client):
+    body = client.get("/api/v1/rentals").get_json()
+    paging = {k: body[k] for k in ["count", "page", "pages", "per_page"]}
+    assert paging == {"count": 5, "page": 1, "pages": 3, "per_page": 2}
+    assert [row["Item"] for row in body["data"]] == ["Dress", "Coat"]
+
+    body = client.get("/api/v1/rentals?page=3").get_json()
+    assert [row["Item"] for row in body["data"]] == ["Jumpsuit"]
+    assert client.get("/api/v1/rentals?page=4").get_json()["data"] == []
+
+
+def test_missing_values_are_null(client):
+    body = client.get("/api/v1/rentals?Item=Skirt&fields=Item,Days").get_json()
+    assert body["data"] == [{"Item": "Skirt", "Days": None}]
+
+
+def test_fields_and_filters(client):
+    body = client.get("/api/v1/rentals?Category=Dress&fields=Item").get_json()
+    assert body["count"] == 2
+    assert body["data"] == [{"Item": "Dress"}, {"Item": "Jumpsuit"}]
+
+
+def test_filters_read_numbers_and_booleans(client):
+    body = client.get("/api/v1/rentals?Days=3&fields=Item").get_json()
+    assert body["data"] == [{"Item": "Dress"}]
+    body = client.get("/api/v1/rentals?Days=3.0&fields=Item").get_json()
+    assert body["data"] == [{"Item": "Dress"}]
+    body = client.get("/api/v1/rentals?Bought=true&fields=Item").get_json()
+    assert body["data"] == [{"Item": "Coat"}]
+
+
+@pytest.mark.parametrize(
+    "query",
+    ["page=0", "page=x", "per_page=4", "fields=Price", "Price=10", "Days=x"],
+)
+def test_bad_queries(client, query):
+    response = client.get(f"/api/v1/rentals?{query}")
+    assert response.status_code == 400
+    assert "error" in response.get_json()
+
+
+def test_unknown_and_missing_tables(client):
+    assert client.get("/api/v1/outfits").status_code == 404
+    assert client.get("/api/v1/rentals/summary").status_code == 404
+
+
+def test_summary(client):
+    assert client.get("/api/v1/summary").get_json() == {"version": "v1", "items": 3}
+
+
+def test_unchanged_responses_are_not_sent_again(client):
+    response = client.get("/api/v1/rentals")
+    etag = response.headers["ETag"]
+    again = client.get("/api/v1/rentals", headers={"If-None-Match": etag})
+    assert again.status_code == 304
+    other = client.get("/api/v1/rentals?page=2", headers={"If-None-Match": etag})
+    assert other.status_code == 200
+
+
+def test_new_builds_get_new_etags(client):
+    etag = client.get("/api/v1/rentals").headers["ETag"]
+    response = serve("b2").get("/api/v1/rentals", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
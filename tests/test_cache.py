@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+"""Tests for the chart caches of `cache`."""
+
+from src.cache import RenderCache, shape
+
+
+def spec(mark, encoding, rows, **extra):
+    """Function to build a one-dataset Vega-Lite spec."""
+    return {
+        "mark": mark,
+        "encoding": encoding,
+        "data": {"name": "data-rows"},
+        "datasets": {"data-rows": rows},
+        **extra,
+    }
+
+
+ROWS = [
+    {"x": 1, "y": 2, "unused": "a"},
+    {"x": 1, "y": 2, "unused": "b"},
+    {"x": 3, "y": 4, "unused": "c"},
+]
+
+XY = {"x": {"field": "x"}, "y": {"field": "y"}}
+
+
+def test_shape_drops_unused_columns_and_repeated_rows():
+    shaped, saved = shape(spec("point", XY, ROWS))
+    (name,) = shaped["datasets"]
+    assert shaped["data"] == {"name": name}
+    assert shaped["datasets"][name] == [{"x": 1, "y": 2}, {"x": 3, "y": 4}]
+    assert saved > 0
+
+
+def test_shape_keeps_rows_that_are_counted():
+    counted = {"x": {"field": "x"}, "y": {"aggregate": "count"}}
+    shaped, _ = shape(spec("point", counted, ROWS))
+    assert len(next(iter(shaped["datasets"].values()))) == 3
+
+    shaped, _ = shape(spec("point", XY, ROWS, transform=[{"window": []}]))
+    assert len(next(iter(shaped["datasets"].values()))) == 3
+
+
+def test_shape_keeps_rows_of_stacking_marks():
+    shaped, _ = shape(spec("bar", XY, ROWS))
+    assert len(next(iter(shaped["datasets"].values()))) == 3
+
+
+def test_shape_keeps_fields_named_in_expressions():
+    filtered = spec("point", XY, ROWS, transform=[{"filter": "datum.unused != 'b'"}])
+    shaped, _ = shape(filtered)
+    rows = next(iter(shaped["datasets"].values()))
+    assert [row["unused"] for row in rows] == ["a", "b", "c"]
+
+
+def test_shape_without_datasets():
+    assert shape({"mark": "point"}) == ({"mark": "point"}, 0)
+
+
+class Chart:
+    """Chart of some rows, as a plot function returns it."""
+
+    def __init__(self, rows, mark="point"):
+        self.rows = rows
+        self.mark = mark
+
+    def to_dict(self):
+        return spec(self.mark, XY, self.rows)
+
+
+def plot_points(rows):
+    return Chart(rows)
+
+
+def plot_bars(rows):
+    return Chart(rows, "bar")
+
+
+def test_savings_are_reported_per_plot_of_the_current_version():
+    charts = RenderCache()
+    trimmed = charts.render("v1", plot_points, ROWS).saved
+    assert trimmed > 0
+    assert charts.savings() == {"plot_points": trimmed}
+
+    charts.render("v2", plot_points, ROWS[:1])
+    charts.render("v2", plot_bars, ROWS)
+    saved = charts.savings()
+    assert 0 < saved["plot_points"] < trimmed
+    assert 0 < saved["plot_bars"]
@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+"""Tests for the response compression of `compress`."""
+
+import gzip
+
+import pytest
+from flask import Flask, Response
+
+from src.compress import Compressor
+
+BODY = b'{"rows": [' + b'{"x": 1}, ' * 200 + b"]}"
+
+
+@pytest.fixture
+def server():
+    """Flask server with a large, a small and a tagged JSON response."""
+    server = Flask(__name__)
+    server.compressor = Compressor(threshold=500)
+    server.compressor.register(server)
+
+    @server.route("/large")
+    def large():
+        return Response(BODY, mimetype="application/json")
+
+    @server.route("/small")
+    def small():
+        return Response(b'{"x": 1}', mimetype="application/json")
+
+    @server.route("/tagged")
+    def tagged():
+        response = Response(BODY, mimetype="application/json")
+        response.set_etag("v1")
+        return response
+
+    @server.route("/image")
+    def image():
+        return Response(BODY, mimetype="image/png")
+
+    return server
+
+
+def test_gzips_large_responses(server):
+    response = server.test_client().get("/large", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["Vary"]
+    assert gzip.decompress(response.data) == BODY
+
+
+def test_leaves_small_uncompressible_and_unasked_for_responses(server):
+    client = server.test_client()
+    gzip_only = {"Accept-Encoding": "gzip"}
+    assert "Content-Encoding" not in client.get("/small", headers=gzip_only).headers
+    assert "Content-Encoding" not in client.get("/image", headers=gzip_only).headers
+    response = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in response.headers
+    assert response.data == BODY
+
+
+def test_reuses_bodies_of_tagged_responses(server):
+    client = server.test_client()
+    for _ in range(3):
+        response = client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+        assert gzip.decompress(response.data) == BODY
+        assert response.headers["ETag"] == 'W/"v1"'
+    assert (server.compressor.misses, server.compressor.hits) == (1, 2)
+
+
+def test_keeps_bodies_of_each_url_apart(server):
+    client = server.test_client()
+    client.get("/tagged", headers={"Accept-Encoding": "gzip"})
+    response = client.get("/tagged?page=2", headers={"Accept-Encoding": "gzip"})
+    assert server.compressor.misses == 2
+    assert gzip.decompress(response.data) == BODY
@@ -0,0 +1,21 @@
+#!/usr/bin/env python
+
+"""Tests for the deployment fingerprints of `runtime`."""
+
+from src.runtime import fingerprint_tree
+
+
+def test_fingerprint_tree_only_hashes_included_files(tmp_path):
+    (tmp_path / "app.py").write_text("print('hi')")
+    (tmp_path / "assets").mkdir()
+    (tmp_path / "assets" / "style.css").write_text("body {}")
+    include = ["*.py", "assets/*"]
+    build = fingerprint_tree(str(tmp_path), include=include)
+
+    (tmp_path / "instance").mkdir()
+    (tmp_path / "instance" / "charts.sqlite").write_bytes(b"cache")
+    (tmp_path / "data.csv").write_text("ID\n0\n")
+    assert fingerprint_tree(str(tmp_path), include=include) == build
+
+    (tmp_path / "assets" / "style.css").write_text("body { margin: 0 }")
+    assert fingerprint_tree(str(tmp_path), include=include) != build
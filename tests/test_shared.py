@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+
+"""Tests for the cache shared between processes of `shared`."""
+
+import os
+import stat
+
+import pytest
+
+from src.shared import SharedCache, private_dir
+
+
+@pytest.fixture
+def cache(tmp_path):
+    """Shared cache holding at most 30 bytes."""
+    return SharedCache(str(tmp_path / "cache.sqlite"), max_bytes=30)
+
+
+def test_get_and_put(cache):
+    assert cache.get("a") is None
+    cache.put("a", b"body")
+    assert cache.get("a") == b"body"
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_evicts_least_recently_used(cache):
+    cache.put("a", b"x" * 10)
+    cache.put("b", b"x" * 10)
+    cache.put("c", b"x" * 10)
+    # read, so "b" is now the oldest
+    cache.get("a")
+    cache.put("d", b"x" * 10)
+    assert cache.get("b") is None
+    assert [cache.get(key) is not None for key in "acd"] == [True, True, True]
+
+
+def test_skips_bodies_larger_than_the_cache(cache):
+    cache.put("a", b"x" * 31)
+    assert cache.get("a") is None
+
+
+def test_namespaces_are_apart(tmp_path):
+    path = str(tmp_path / "cache.sqlite")
+    SharedCache(path, namespace="old:").put("a", b"old")
+    new = SharedCache(path, namespace="new:")
+    assert new.get("a") is None
+    new.put("a", b"new")
+    assert SharedCache(path, namespace="old:").get("a") == b"old"
+
+
+def test_unusable_file_only_misses(tmp_path):
+    cache = SharedCache(str(tmp_path / "missing" / "cache.sqlite"))
+    with pytest.warns(UserWarning, match="unavailable"):
+        cache.put("a", b"body")
+    with pytest.warns(UserWarning, match="unavailable"):
+        assert cache.get("a") is None
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_private_dir(tmp_path):
+    path = tmp_path / "cache"
+    path.mkdir(mode=0o777)
+    os.chmod(path, 0o777)
+    assert private_dir(str(path)) == str(path)
+    assert stat.S_IMODE(path.stat().st_mode) == 0o700
+    created = tmp_path / "new"
+    private_dir(str(created))
+    assert stat.S_IMODE(created.stat().st_mode) == 0o700
@@ -1,24 +1,202 @@
 #!/usr/bin/env python
 
-"""Tests for `sheworewhat` package."""
+"""Tests for the wardrobe computations of `sheworewhat`."""
 
+import codecs
+
+import numpy as np
+import pandas as pd
 import pytest
 
+from src import sheworewhat
+from src.sheworewhat import (
+    CategoryIndex,
+    assign_ids,
+    closet_aggregates,
+    kmeans,
+    persist_ids,
+    simulate,
+    wear_clusters,
+)
+
 
-from sheworewhat import sheworewhat
+@pytest.fixture
+def log():
+    """Wear log of two summer items, two winter items and a dormant one."""
+    rows = []
+    for week in range(22, 32):
+        day = pd.Timestamp("2022-01-01") + pd.Timedelta(weeks=week)
+        rows += [(day, 0), (day, 1)]
+    for week in list(range(0, 6)) + list(range(47, 52)):
+        day = pd.Timestamp("2022-01-01") + pd.Timedelta(weeks=week)
+        rows += [(day, 2), (day, 3)]
+    rows.append((pd.Timestamp("2022-06-01"), 4))
+    return pd.DataFrame(rows, columns=["Date", "ID"])
 
 
 @pytest.fixture
-def response():
-    """Sample pytest fixture.
+def seasonal_log():
+    """Wear log of 80 items, each worn around a random day of the year."""
+    rng = np.random.default_rng(0)
+    rows = []
+    for item in range(80):
+        peak = rng.integers(0, 365)
+        n = rng.integers(0, 40)
+        spread = rng.integers(10, 120)
+        for day in (peak + rng.normal(0, spread, n)).astype(int) % 365:
+            rows.append(
+                (pd.Timestamp("2022-01-01") + pd.Timedelta(days=int(day)), item)
+            )
+    log = pd.DataFrame(rows, columns=["Date", "ID"])
+    return log.sort_values(["Date", "ID"], kind="mergesort", ignore_index=True)
+
+
+@pytest.fixture
+def aggs():
+    """Aggregates of a closet of three items, one of them bought this year."""
+    worn = pd.DataFrame(
+        {
+            "ID": [7, 2, 5],
+            "Price": [30.0, 10.0, 0.0],
+            "Count": [3.0, 10.0, 4.0],
+            "2023": ["Yes", "No", "No"],
+            "Category": ["Top", "Bottom", "Top"],
+        }
+    )
+    log = pd.DataFrame({"Date": ["2023-01-01", "2023-01-14"]})
+    return closet_aggregates(worn, log)
+
+
+@pytest.fixture(autouse=True)
+def cold_clusters(monkeypatch):
+    """Start every test without a previous clustering run."""
+    monkeypatch.setattr(sheworewhat, "_cluster_cache", {})
+
+
+def test_kmeans_separates_groups():
+    X = np.array([[0, 0], [0, 0.1], [0.1, 0], [5, 5], [5, 5.1], [5.1, 5]])
+    labels, centroids = kmeans(X, 2)
+    assert len(set(labels[:3])) == 1
+    assert len(set(labels[3:])) == 1
+    assert labels[0] != labels[3]
+    assert centroids.shape == (2, 2)
+
+
+def test_kmeans_caps_clusters_at_points():
+    labels, centroids = kmeans(np.array([[1.0, 2.0]]), 4)
+    assert list(labels) == [0]
+    assert len(centroids) == 1
+
+
+def test_wear_clusters_names_seasons(log):
+    items, profile = wear_clusters(log, range(5), k=2)
+    clusters = dict(zip(items["ID"], items["Cluster"]))
+    assert clusters[0] == clusters[1] == "Summer"
+    assert clusters[2] == clusters[3] == "Winter"
+    assert clusters[4] == "Dormant"
+    assert set(profile["Cluster"]) == {"Summer", "Winter", "Dormant"}
+
+
+def test_wear_clusters_grown_log_matches_cold_run(seasonal_log, monkeypatch):
+    wear_clusters(seasonal_log.iloc[: len(seasonal_log) * 7 // 10], range(80))
+    grown, grown_profile = wear_clusters(seasonal_log, range(80))
+
+    monkeypatch.setattr(sheworewhat, "_cluster_cache", {})
+    cold, cold_profile = wear_clusters(seasonal_log, range(80))
+    pd.testing.assert_frame_equal(grown, cold)
+    pd.testing.assert_frame_equal(grown_profile, cold_profile)
+
+
+def test_wear_clusters_edited_log_is_not_treated_as_grown(log):
+    wear_clusters(log, range(5), k=2)
+    edited = log.copy()
+    edited.loc[0, "ID"] = 4
+    items, _ = wear_clusters(edited, range(5), k=2)
+    assert items.loc[items["ID"] == 4, "Wears"].item() == 2
+
+
+def test_simulate_without_scenario_matches_closet(aggs):
+    stats = simulate(aggs)
+    assert stats["items"] == 3
+    assert stats["avg_price"] == 20.0
+    assert stats["avg_worn"] == 6.5
+    assert stats["spent"] == 30.0
+    assert stats["categories"] == {"Top": 2, "Bottom": 1}
+
+
+def test_simulate_adds_and_removes(aggs):
+    stats = simulate(
+        aggs,
+        add=[{"Price": 0, "Rate": 1, "Category": "Shoes"}],
+        remove=[7, 7, 99],
+    )
+    assert stats["items"] == 3
+    assert stats["avg_price"] == 10.0
+    assert stats["categories"] == {"Top": 1, "Bottom": 1, "Shoes": 1}
+
+
+def test_simulate_empty_closet():
+    worn = pd.DataFrame(
+        {"ID": pd.Series([], dtype=int), "Price": [], "Count": [], "2023": []}
+    ).assign(Category=pd.Series([], dtype=object))
+    aggs = closet_aggregates(worn, pd.DataFrame({"Date": ["2023-01-01"]}))
+    stats = simulate(
+        aggs, add=[{"Price": 10, "Rate": 1, "Category": "Top"}], remove=[3]
+    )
+    assert stats["items"] == 1
+    assert stats["avg_price"] == 10.0
+    assert stats["categories"] == {"Top": 1}
+
+
+def test_assign_ids_keeps_ids_and_numbers_new_items():
+    closet = pd.DataFrame({"ID": [3, None, 0, None], "Item": list("abcd")})
+    with pytest.warns(UserWarning, match="2 closet items have no ID"):
+        ids = assign_ids(closet)
+    assert list(ids) == [3, 4, 0, 5]
+
+
+def test_assign_ids_uses_row_order_without_column():
+    assert list(assign_ids(pd.DataFrame({"Item": list("abc")}))) == [0, 1, 2]
+
+
+def test_assign_ids_rejects_duplicates():
+    closet = pd.DataFrame({"ID": [1, 2, 1, None], "Item": list("abcd")})
+    with pytest.raises(ValueError, match=r"ID 1 on lines \[2, 4\]"):
+        assign_ids(closet)
+
+
+def test_persist_ids_keeps_the_file_as_it_was(tmp_path):
+    path = tmp_path / "closet.csv"
+    text = 'ID,Item,Bought,Price\r\n0,Tank,"Secondhand, Thrifted",15\r\n,Jeans,New,'
+    path.write_bytes(codecs.BOM_UTF8 + text.encode())
+
+    closet = persist_ids(str(path))
+    assert list(closet["ID"]) == ["0", "1"]
+    assert (
+        path.read_bytes()
+        == codecs.BOM_UTF8 + text.replace(",Jeans", "1,Jeans").encode()
+    )
+
 
-    See more at: http://doc.pytest.org/en/latest/fixture.html
-    """
-    # import requests
-    # return requests.get('https://github.com/audreyr/cookiecutter-pypackage')
+def test_persist_ids_leaves_complete_file_untouched(tmp_path):
+    path = tmp_path / "closet.csv"
+    path.write_bytes(b"ID,Item,Price\n0,Tank,15.00\n")
+    mtime = path.stat().st_mtime_ns
+    persist_ids(str(path))
+    assert path.stat().st_mtime_ns == mtime
+    assert path.read_bytes() == b"ID,Item,Price\n0,Tank,15.00\n"
 
 
-def test_content(response):
-    """Sample pytest test function with the pytest fixture as an argument."""
-    # from bs4 import BeautifulSoup
-    # assert 'GitHub' in BeautifulSoup(response.content).title.string
+def test_category_index_counts_leave_out_rows_without_category():
+    closet = pd.DataFrame(
+        {
+            "Category": ["Top", "Bottom", None, "Top"],
+            "Sub-Category": ["Tank", "Skirt", "Sock", "Tank"],
+            "Count": [1, 0, 0, 2],
+        }
+    )
+    index = CategoryIndex(closet)
+    unworn = index.count(index.df["Count"] == 0)
+    assert unworn.to_dict("records") == [{"Category": "Bottom", "Count": 1}]
+    assert dict(index.count().values) == {"Bottom": 1, "Top": 2}
+    assert list(index.sub("Top", "Tank")["Count"]) == [1, 2]